@@ -0,0 +1,64 @@
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Benchmark de memória: pico de RSS ao montar um DIT grande em memória (python-docx) x em streaming.
+# As seções seguem o caminho do pipeline (main._escrever_documento): cada uma é montada com montar_fragmento
+# sobre o rascunho do escritor e gravada com escrever_fragmento, na ordem do documento, logo que fica pronta.
+# Cada escritor roda em um processo próprio, para que o pico de um não contamine o outro.
+# Uso: python benchmarks/bench_escritor_docx.py [notebooks] [celulas_por_notebook]
+
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+CODIGO = "\n".join(
+    f"df_{n} = spark.table('bronze.tabela_{n}').filter(col('data') >= '2024-01-01').select('id', 'valor')"
+    for n in range(20)
+)
+RESUMO = "Este trecho lê a tabela de origem, aplica o filtro de data e seleciona as colunas usadas nas etapas seguintes. " * 3
+
+def montar(streaming, notebooks, celulas, saida):
+    import main
+    from functions.escritor_docx import criar_escritor, montar_fragmento
+    from functions.modelo_dit import adicionar_secao_notebook
+
+    inicio = time.perf_counter()
+    escritor = criar_escritor(main.modelo_documento(), saida, streaming)
+    for idx in range(1, notebooks + 1):
+        resumos_secao = {(idx, i): RESUMO for i in range(1, celulas + 1)}
+        fragmento = montar_fragmento(
+            escritor.rascunho, adicionar_secao_notebook, idx, f"Notebook {idx}", "Texto do notebook.", [CODIGO] * celulas, resumos_secao
+        )
+        escritor.escrever_fragmento(fragmento)
+    escritor.salvar()
+    return {
+        "segundos": round(time.perf_counter() - inicio, 2),
+        # ru_maxrss: KB no Linux
+        "pico_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "tamanho_mb": round(Path(saida).stat().st_size / (1024 * 1024), 2),
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--filho":
+        _, _, modo, notebooks, celulas, saida = sys.argv
+        print(json.dumps(montar(modo == "streaming", int(notebooks), int(celulas), saida)))
+        sys.exit(0)
+
+    notebooks = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    celulas = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    with tempfile.TemporaryDirectory() as pasta:
+        for modo in ("memoria", "streaming"):
+            saida = Path(pasta) / f"DIT_{modo}.docx"
+            processo = subprocess.run(
+                [sys.executable, __file__, "--filho", modo, str(notebooks), str(celulas), str(saida)],
+                cwd=base_dir, capture_output=True, text=True, check=True
+            )
+            r = json.loads(processo.stdout.strip().splitlines()[-1])
+            print(
+                f"{modo:<10} | {notebooks} notebooks x {celulas} células | pico RSS: {r['pico_rss_mb']:8.1f} MB | "
+                f"tempo: {r['segundos']:6.2f} s | arquivo: {r['tamanho_mb']:.2f} MB"
+            )
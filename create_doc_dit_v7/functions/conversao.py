@@ -1,5 +1,33 @@
-import subprocess
-import sys
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Incrementar quando a forma de converter mudar: invalida o manifesto da conversão incremental
+VERSAO_CONVERSOR = "2"
+
+def versao_conversor():
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return f"{VERSAO_CONVERSOR}+nbconvert-{version('nbconvert')}"
+    except PackageNotFoundError:
+        return VERSAO_CONVERSOR
+
+# O exportador é criado uma única vez por processo: importar nbconvert/Jinja e
+# carregar o template custa mais que a conversão de um notebook.
+_exportador = None
+_lock_exportador = threading.Lock()
+
+def _obter_exportador():
+    global _exportador
+    if _exportador is None:
+        with _lock_exportador:
+            if _exportador is None:
+                from nbconvert import MarkdownExporter
+                _exportador = MarkdownExporter()
+    return _exportador
 
 def converte_to_md(arquivo_path, base_dir, logger):
     if not arquivo_path.exists():
@@ -7,15 +35,73 @@ def converte_to_md(arquivo_path, base_dir, logger):
         return False
 
     try:
+        from nbconvert.writers import FilesWriter
+
         markdown_dir = base_dir / "markdown"
-        subprocess.check_call([
-            sys.executable, "-m", "nbconvert",
-            "--to", "markdown",
-            "--output-dir", str(markdown_dir),
-            str(arquivo_path)
-        ])
+        # unique_key e output_files_dir são os mesmos que a linha de comando do nbconvert passa: sem eles as
+        # imagens de todos os notebooks iriam para markdown/output_<i>_<j>.png e uma sobrescreveria a outra
+        stem = arquivo_path.stem
+        corpo, recursos = _obter_exportador().from_filename(
+            str(arquivo_path),
+            resources={"unique_key": stem, "output_files_dir": f"{stem}_files"}
+        )
+        # FilesWriter grava o .md e as imagens de saída (<nome>_files/<nome>_<i>_<j>.png)
+        FilesWriter(build_directory=str(markdown_dir)).write(corpo, recursos, notebook_name=stem)
         logger.info(f"[✓] Convertido para Markdown com sucesso: {arquivo_path.name}\n")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         logger.exception(f"[✗] Erro durante a conversão de {arquivo_path.name}: {e}\n")
         return False
+
+#---------------------------------------------------------------------------------------------------------------------------------
+# Conversão paralela: cada processo do pool envia seus logs por uma fila para o processo principal,
+# onde um QueueListener repassa as mensagens aos handlers do log da execução (arquivo + console).
+def _inicializar_worker(fila_log):
+    raiz = logging.getLogger()
+    raiz.handlers[:] = [logging.handlers.QueueHandler(fila_log)]
+    raiz.setLevel(logging.DEBUG)
+
+def _converter_no_worker(arquivo_path, base_dir):
+    return converte_to_md(arquivo_path, base_dir, logging.getLogger("conversao"))
+
+def converter_notebooks(notebooks, base_dir, logger, max_workers=None):
+    # Retorna (convertidos, falhas): a lista dos notebooks convertidos e o número de falhas
+    convertidos, falhas = [], 0
+    if not notebooks:
+        return convertidos, falhas
+
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(notebooks)))
+
+    if max_workers == 1:
+        for arquivo in notebooks:
+            if converte_to_md(arquivo, base_dir, logger):
+                convertidos.append(arquivo)
+            else:
+                falhas += 1
+        return convertidos, falhas
+
+    logger.info(f"[⚙️] Convertendo {len(notebooks)} notebook(s) com {max_workers} processo(s)...")
+    # spawn: a conversão pode rodar dentro da interface, um processo com threads (fila de jobs, cliente HTTP
+    # do LLM, cache SQLite), e um fork copiaria locks presos por outras threads
+    contexto = multiprocessing.get_context("spawn")
+    fila_log = contexto.Queue()
+    listener = logging.handlers.QueueListener(fila_log, *(logger.handlers or logging.getLogger().handlers), respect_handler_level=True)
+    listener.start()
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto, initializer=_inicializar_worker, initargs=(fila_log,)) as executor:
+            futuros = {executor.submit(_converter_no_worker, arquivo, base_dir): arquivo for arquivo in notebooks}
+            for futuro in as_completed(futuros):
+                try:
+                    sucesso = futuro.result()
+                except Exception as e:
+                    logger.exception(f"[✗] Falha no processo de conversão de {futuros[futuro].name}: {e}")
+                    sucesso = False
+                if sucesso:
+                    convertidos.append(futuros[futuro])
+                else:
+                    falhas += 1
+    finally:
+        listener.stop()
+
+    return convertidos, falhas
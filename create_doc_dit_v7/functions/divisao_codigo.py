@@ -0,0 +1,84 @@
+import ast
+
+from functions.empacotamento import obter_codificador, contar_tokens
+
+# Divisão de células de código grandes em partes que cabem na janela de contexto do modelo.
+# As quebras acontecem em fronteiras de instrução: instruções de nível superior (via ast) quando o
+# código é Python válido; caso contrário (magics do Databricks, SQL), linhas em branco e linhas
+# terminadas em ";". Uma unidade que sozinha passa do limite é quebrada por linhas.
+
+def _unidades_python(codigo):
+    try:
+        arvore = ast.parse(codigo)
+    except SyntaxError:
+        return None
+    linhas = codigo.splitlines()
+    if not arvore.body:
+        return None
+
+    unidades, inicio = [], 0
+    for instrucao in arvore.body[1:]:
+        # Em def/class decorados, lineno é a linha do def/class: a unidade começa no primeiro decorador.
+        # Comentários e linhas em branco antes da instrução ficam com ela
+        decoradores = getattr(instrucao, "decorator_list", None)
+        fim = (min(d.lineno for d in decoradores) if decoradores else instrucao.lineno) - 1
+        while fim > inicio and (not linhas[fim - 1].strip() or linhas[fim - 1].lstrip().startswith("#")):
+            fim -= 1
+        unidades.append("\n".join(linhas[inicio:fim]))
+        inicio = fim
+    unidades.append("\n".join(linhas[inicio:]))
+    return [u for u in unidades if u.strip()]
+
+def _unidades_texto(codigo):
+    unidades, atual = [], []
+    for linha in codigo.splitlines():
+        atual.append(linha)
+        if not linha.strip() or linha.rstrip().endswith(";"):
+            unidades.append("\n".join(atual))
+            atual = []
+    if atual:
+        unidades.append("\n".join(atual))
+    return [u for u in unidades if u.strip()]
+
+def _quebrar_por_linhas(unidade, modelo, max_tokens):
+    parte, tokens_parte = [], 0
+    for linha in unidade.splitlines():
+        tokens = contar_tokens(linha, modelo) + 1
+        if tokens > max_tokens:
+            # Linha única maior que o limite (ex.: código minificado): corta pelos tokens
+            if parte:
+                yield "\n".join(parte)
+                parte, tokens_parte = [], 0
+            codificador = obter_codificador(modelo)
+            ids = codificador.encode(linha, disallowed_special=())
+            for inicio in range(0, len(ids), max_tokens):
+                yield codificador.decode(ids[inicio:inicio + max_tokens])
+            continue
+        if parte and tokens_parte + tokens > max_tokens:
+            yield "\n".join(parte)
+            parte, tokens_parte = [], 0
+        parte.append(linha)
+        tokens_parte += tokens
+    if parte:
+        yield "\n".join(parte)
+
+def dividir_codigo(codigo, modelo, max_tokens):
+    # Gera as partes em ordem, cada uma com no máximo ~max_tokens tokens
+    unidades = _unidades_python(codigo) or _unidades_texto(codigo)
+
+    parte, tokens_parte = [], 0
+    for unidade in unidades:
+        tokens = contar_tokens(unidade, modelo)
+        if tokens > max_tokens:
+            if parte:
+                yield "\n".join(parte)
+                parte, tokens_parte = [], 0
+            yield from _quebrar_por_linhas(unidade, modelo, max_tokens)
+            continue
+        if parte and tokens_parte + tokens > max_tokens:
+            yield "\n".join(parte)
+            parte, tokens_parte = [], 0
+        parte.append(unidade)
+        tokens_parte += tokens
+    if parte:
+        yield "\n".join(parte)
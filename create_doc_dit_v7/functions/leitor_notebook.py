@@ -0,0 +1,58 @@
+import json
+from collections import namedtuple
+
+# Leitura direta do JSON do .ipynb, sem passar por markdown.
+# tipo: "code" ou "markdown"; ordem_execucao: execution_count do Jupyter (None se a célula não foi executada;
+# exportações do Databricks gravam 0 em todas as células, o que também vira None);
+# posicao: índice da célula no notebook (ordem em que aparece no documento).
+Celula = namedtuple("Celula", ["tipo", "fonte", "ordem_execucao", "posicao"])
+
+def _linguagem(notebook):
+    metadata = notebook.get("metadata", {})
+    return (
+        metadata.get("language_info", {}).get("name")
+        or metadata.get("kernelspec", {}).get("language")
+        or metadata.get("application/vnd.databricks.v1+notebook", {}).get("language")
+        or "python"
+    ).lower()
+
+def ler_notebook(caminho):
+    # Retorna (linguagem, celulas) lendo o JSON uma única vez; células "raw" são ignoradas
+    with open(caminho, "r", encoding="utf-8") as f:
+        notebook = json.load(f)
+
+    celulas = []
+    for posicao, celula in enumerate(notebook.get("cells", [])):
+        tipo = celula.get("cell_type")
+        if tipo not in ("code", "markdown"):
+            continue
+        fonte = celula.get("source", "")
+        if isinstance(fonte, list):
+            fonte = "".join(fonte)
+        celulas.append(Celula(tipo, fonte, celula.get("execution_count") or None, posicao))
+    return _linguagem(notebook), celulas
+
+def extrair_conteudo_notebook(caminho):
+    # Retorna (texto, celulas_codigo) no formato usado pelo documento:
+    # texto = células markdown sem títulos/tabelas; celulas_codigo = células de código Python não vazias (Celula),
+    # na ordem do notebook, com a ordem de execução usada nos prompts de resumo
+    linguagem, celulas = ler_notebook(caminho)
+    linhas_texto, celulas_codigo = [], []
+    for celula in celulas:
+        if celula.tipo == "markdown":
+            linhas_texto.extend(
+                linha for linha in celula.fonte.splitlines() if not linha.strip().startswith(("|", "#"))
+            )
+        elif linguagem == "python" and celula.fonte.strip():
+            celulas_codigo.append(celula)
+    return "\n".join(linhas_texto).strip(), celulas_codigo
+
+def descrever_ordem_execucao(ordem_execucao):
+    # Linha de contexto dos prompts de resumo; vazia quando a ordem não é conhecida (célula não executada
+    # ou notebook lido do markdown)
+    if ordem_execucao is None:
+        return ""
+    return (
+        f"- Na última execução salva do notebook esta célula foi executada na posição {ordem_execucao} "
+        "(execution_count), que pode diferir da ordem das seções: considere dependências de células executadas antes.\n"
+    )
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import shutil
+
+# Manifesto da conversão incremental, gravado em markdown/.manifesto.json:
+# {"<notebook>.ipynb": {"hash": "<sha256 do .ipynb>", "versao": "<versão do conversor>"}}
+ARQUIVO_MANIFESTO = ".manifesto.json"
+
+def hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+def carregar_manifesto(markdown_dir):
+    caminho = markdown_dir / ARQUIVO_MANIFESTO
+    if not caminho.exists():
+        return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Manifesto corrompido: força a reconversão de tudo
+        return {}
+
+def salvar_manifesto(markdown_dir, manifesto):
+    markdown_dir.mkdir(parents=True, exist_ok=True)
+    caminho = markdown_dir / ARQUIVO_MANIFESTO
+    temporario = caminho.with_suffix(".tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(temporario, caminho)
+
+def planejar_conversao(notebooks, markdown_dir, versao, logger):
+    # Retorna (pendentes, hashes, manifesto): só notebooks novos ou alterados precisam ser convertidos.
+    # Markdown de notebooks que não existem mais é removido aqui.
+    manifesto = carregar_manifesto(markdown_dir)
+    pendentes, hashes = [], {}
+
+    for arquivo in notebooks:
+        hashes[arquivo.name] = hash_arquivo(arquivo)
+        registro = manifesto.get(arquivo.name)
+        atualizado = (
+            registro is not None
+            and registro.get("hash") == hashes[arquivo.name]
+            and registro.get("versao") == versao
+            and (markdown_dir / f"{arquivo.stem}.md").exists()
+        )
+        if not atualizado:
+            pendentes.append(arquivo)
+
+    nomes_atuais = {arquivo.name for arquivo in notebooks}
+    for nome in [n for n in manifesto if n not in nomes_atuais]:
+        stem = os.path.splitext(nome)[0]
+        md_path = markdown_dir / f"{stem}.md"
+        if md_path.exists():
+            md_path.unlink()
+        shutil.rmtree(markdown_dir / f"{stem}_files", ignore_errors=True)
+        del manifesto[nome]
+        logger.info(f"[-] Markdown removido (notebook excluído): {md_path.name}")
+
+    return pendentes, hashes, manifesto
+
+def registrar_conversoes(markdown_dir, manifesto, convertidos, hashes, versao):
+    for arquivo in convertidos:
+        manifesto[arquivo.name] = {"hash": hashes[arquivo.name], "versao": versao}
+    salvar_manifesto(markdown_dir, manifesto)
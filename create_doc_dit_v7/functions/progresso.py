@@ -0,0 +1,42 @@
+import json
+import threading
+import time
+
+# Eventos estruturados de progresso do pipeline.
+# Cada evento é um dicionário {"etapa": ..., <campos da etapa>, "tokens": <total até agora>, "decorrido": <s>}.
+# Etapas: inicio, sumario, introducao, leitura (uma por notebook), resumo (uma por notebook a cada chamada concluída),
+# documento e fim. Sem destino configurado os eventos são descartados, mas os tokens continuam somados.
+
+class EmissorProgresso:
+    def __init__(self, destino=None):
+        self.destino = destino
+        self.inicio = time.perf_counter()
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def somar_tokens(self, quantidade):
+        with self._lock:
+            self.tokens += quantidade or 0
+
+    def emitir(self, etapa, **campos):
+        if self.destino is None:
+            return
+        with self._lock:
+            evento = {"etapa": etapa, **campos, "tokens": self.tokens, "decorrido": round(time.perf_counter() - self.inicio, 3)}
+            # O destino roda sob o lock para que os eventos saiam na ordem em que foram gerados
+            self.destino(evento)
+
+def destino_jsonl(arquivo):
+    # Escreve cada evento como uma linha {"evento": {...}}, com flush para quem lê o pipe em tempo real
+    def escrever(evento):
+        arquivo.write(json.dumps({"evento": evento}, ensure_ascii=False) + "\n")
+        arquivo.flush()
+    return escrever
+
+def tokens_da_resposta(resposta):
+    # Total de tokens informado pela API em uma resposta do ChatOpenAI (0 se não informado)
+    uso = getattr(resposta, "usage_metadata", None) or {}
+    if uso.get("total_tokens"):
+        return uso["total_tokens"]
+    uso = (getattr(resposta, "response_metadata", None) or {}).get("token_usage") or {}
+    return uso.get("total_tokens") or 0
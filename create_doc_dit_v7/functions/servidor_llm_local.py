@@ -0,0 +1,126 @@
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Servidor local que imita o endpoint /v1/chat/completions da OpenAI.
+# Permite rodar o pipeline offline apontando OPENAI_BASE_URL para http://127.0.0.1:<porta>/v1
+# Uso: python -m functions.servidor_llm_local --porta 8765 --latencia 0.5
+# Para testar limites e falhas: respostas_erro é uma lista de status HTTP (ex.: [503, 503, 429]) devolvidos,
+# um por requisição, antes das respostas normais; limite_rpm > 0 envia os cabeçalhos x-ratelimit-* da OpenAI.
+# servidor.requisicoes conta as requisições recebidas e servidor.simultaneas_max o pico de requisições simultâneas.
+
+def _resposta_simulada(mensagens):
+    prompt = "\n".join(str(m.get("content", "")) for m in mensagens)
+    assinatura = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+
+    # Prompts em lote (functions/empacotamento.py) esperam um JSON com um resumo por seção
+    secoes = re.findall(r"^### BLOCO (\S+)$", prompt, flags=re.MULTILINE)
+    if secoes:
+        return json.dumps({secao: f"Resumo simulado [{assinatura}] da seção {secao}." for secao in secoes}, ensure_ascii=False)
+    return f"Resumo simulado [{assinatura}] para um prompt de {len(prompt)} caracteres."
+
+
+class _Handler(BaseHTTPRequestHandler):
+    latencia = 0.0
+    limite_rpm = 0
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404, "Endpoint não suportado")
+            return
+
+        tamanho = int(self.headers.get("Content-Length", 0))
+        corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        mensagens = corpo.get("messages", [])
+
+        servidor = self.server
+        with servidor.lock:
+            servidor.requisicoes += 1
+            servidor.simultaneas += 1
+            servidor.simultaneas_max = max(servidor.simultaneas_max, servidor.simultaneas)
+            status_erro = servidor.respostas_erro.pop(0) if servidor.respostas_erro else None
+        try:
+            if self.latencia:
+                time.sleep(self.latencia)
+            if status_erro is not None:
+                self._responder(status_erro, {"error": {"message": f"Erro simulado {status_erro}", "type": "simulado", "code": None}})
+            else:
+                self._responder(200, self._conclusao(corpo, mensagens))
+        finally:
+            with servidor.lock:
+                servidor.simultaneas -= 1
+
+    def _conclusao(self, corpo, mensagens):
+        conteudo = _resposta_simulada(mensagens)
+        tokens_prompt = sum(len(str(m.get("content", "")).split()) for m in mensagens)
+        tokens_resposta = len(conteudo.split())
+        resposta = {
+            "id": "chatcmpl-local",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": corpo.get("model", "local"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": conteudo},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": tokens_prompt,
+                "completion_tokens": tokens_resposta,
+                "total_tokens": tokens_prompt + tokens_resposta,
+            },
+        }
+        return resposta
+
+    def _responder(self, status, conteudo):
+        dados = json.dumps(conteudo).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        if self.limite_rpm:
+            self.send_header("x-ratelimit-limit-requests", str(self.limite_rpm))
+            self.send_header("x-ratelimit-remaining-requests", str(max(0, self.limite_rpm - self.server.requisicoes)))
+            self.send_header("x-ratelimit-reset-requests", "1s")
+        if status == 429:
+            self.send_header("retry-after-ms", "10")
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _criar_servidor(porta, latencia, respostas_erro=(), limite_rpm=0):
+    handler = type("HandlerLLMLocal", (_Handler,), {"latencia": latencia, "limite_rpm": limite_rpm})
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    servidor.lock = threading.Lock()
+    servidor.respostas_erro = list(respostas_erro)
+    servidor.requisicoes = 0
+    servidor.simultaneas = 0
+    servidor.simultaneas_max = 0
+    return servidor
+
+def iniciar_servidor_llm_local(porta=0, latencia=0.0, respostas_erro=(), limite_rpm=0):
+    # Sobe o servidor em uma thread daemon e retorna (servidor, base_url)
+    servidor = _criar_servidor(porta, latencia, respostas_erro, limite_rpm)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{servidor.server_address[1]}/v1"
+    return servidor, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de chat local para testes offline.")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso simulado por requisição (s)")
+    args = parser.parse_args()
+
+    servidor = _criar_servidor(args.porta, args.latencia)
+    print(f"[✓] Servidor LLM local em http://127.0.0.1:{args.porta}/v1 (latência {args.latencia}s)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.shutdown()
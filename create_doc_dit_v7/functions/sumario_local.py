@@ -0,0 +1,58 @@
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+# Sumário sem LLM: os títulos vêm do nome dos arquivos, normalizados de forma determinística.
+# "01_dim_empresa_farol.ipynb" -> "DIM Empresa Farol": remove o prefixo numérico, troca "_"/"-" por espaço
+# e aplica o dicionário de siglas e grafias; as demais palavras ficam capitalizadas, exceto
+# preposições e artigos no meio do título.
+# O dicionário pode ser estendido com um JSON {"palavra": "Grafia"} apontado por DIT_DICIONARIO_TITULOS.
+
+DICIONARIO_PADRAO = {
+    "dim": "DIM",
+    "fato": "Fato",
+    "farol": "Farol",
+    "api": "API",
+    "bi": "BI",
+    "csv": "CSV",
+    "dit": "DIT",
+    "etl": "ETL",
+    "id": "ID",
+    "json": "JSON",
+    "kpi": "KPI",
+    "sql": "SQL",
+}
+
+PALAVRAS_MINUSCULAS = {"a", "as", "o", "os", "e", "de", "da", "das", "do", "dos", "em", "na", "no", "para", "por", "com"}
+
+_PREFIXO_NUMERICO = re.compile(r"^[\d\s._-]+")
+_SEPARADORES = re.compile(r"[_\-\s]+")
+
+@lru_cache(maxsize=None)
+def carregar_dicionario(caminho=None):
+    dicionario = dict(DICIONARIO_PADRAO)
+    caminho = caminho or os.getenv("DIT_DICIONARIO_TITULOS")
+    if caminho:
+        with open(caminho, "r", encoding="utf-8") as f:
+            dicionario.update({k.lower(): v for k, v in json.load(f).items()})
+    return dicionario
+
+def normalizar_titulo(nome, dicionario=None):
+    dicionario = dicionario if dicionario is not None else carregar_dicionario()
+    base = _PREFIXO_NUMERICO.sub("", Path(nome).stem) or Path(nome).stem
+    palavras = []
+    for n, palavra in enumerate(p for p in _SEPARADORES.split(base) if p):
+        chave = palavra.lower()
+        if chave in dicionario:
+            palavras.append(dicionario[chave])
+        elif n > 0 and chave in PALAVRAS_MINUSCULAS:
+            palavras.append(chave)
+        else:
+            palavras.append(palavra[:1].upper() + palavra[1:].lower())
+    return " ".join(palavras)
+
+def gerar_sumario_local(nomes, dicionario=None):
+    # Mesmo formato pedido ao LLM: um título numerado por linha
+    return "\n".join(f"{n}. {normalizar_titulo(nome, dicionario)}" for n, nome in enumerate(nomes, start=1))
@@ -0,0 +1,102 @@
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Testes do cache persistente de respostas do LLM (functions/cache_llm.py)
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from functions.cache_llm import CacheLLM
+
+
+class TestCacheLLM(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, ignore_errors=True)
+        self.caminho = Path(self.pasta) / "cache" / "llm.sqlite"
+
+    def abrir(self, tamanho_max_bytes=200 * 1024 * 1024):
+        cache = CacheLLM(self.caminho, tamanho_max_bytes)
+        self.addCleanup(cache.fechar)
+        return cache
+
+    def test_chave_depende_de_todas_as_partes(self):
+        self.assertEqual(CacheLLM.chave("m", 0.5, "1", "x"), CacheLLM.chave("m", 0.5, "1", "x"))
+        self.assertNotEqual(CacheLLM.chave("m", 0.5, "1", "x"), CacheLLM.chave("m", 0.5, "2", "x"))
+
+    def test_remove_os_acessados_ha_mais_tempo(self):
+        cache = self.abrir(tamanho_max_bytes=30)
+        for chave in ("a", "b", "c"):
+            cache.gravar(chave, "x" * 10)
+            time.sleep(0.01)
+        self.assertEqual(cache.obter("a"), "x" * 10)  # "a" passa a ser o mais recente
+        time.sleep(0.01)
+        cache.gravar("d", "x" * 10)
+        self.assertIsNone(cache.obter("b"))
+        self.assertEqual([cache.obter(c) is not None for c in ("a", "c", "d")], [True, True, True])
+        self.assertEqual(cache.removidos, 1)
+
+    def test_regravar_a_mesma_chave_nao_conta_em_dobro(self):
+        cache = self.abrir(tamanho_max_bytes=20)
+        cache.gravar("a", "x" * 10)
+        cache.gravar("b", "x" * 10)
+        cache.gravar("b", "y" * 10)
+        self.assertEqual(cache.removidos, 0)
+        self.assertEqual(cache.obter("a"), "x" * 10)
+
+    def test_tamanho_inclui_o_que_outra_conexao_gravou(self):
+        primeiro, segundo = self.abrir(tamanho_max_bytes=50), self.abrir(tamanho_max_bytes=50)
+        for n in range(5):
+            primeiro.gravar(f"a{n}", "x" * 10)
+            time.sleep(0.01)
+        segundo.gravar("b", "y" * 10)
+        self.assertIsNone(segundo.obter("a0"))
+        self.assertEqual(primeiro.obter("b"), "y" * 10)
+        self.assertEqual(primeiro._tamanho_total(), 50)
+
+    def test_persistencia_entre_instancias(self):
+        cache = self.abrir()
+        cache.gravar("a", "resposta")
+        cache.fechar()
+        self.assertEqual(self.abrir().obter("a"), "resposta")
+
+    def test_obter_ou_gerar_gera_uma_vez_por_chave(self):
+        cache = self.abrir()
+        chamadas = []
+
+        def gerar():
+            chamadas.append(threading.get_ident())
+            time.sleep(0.1)
+            return "resumo"
+
+        resultados = []
+        threads = [threading.Thread(target=lambda: resultados.append(cache.obter_ou_gerar("k", gerar))) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(resultados, ["resumo"] * 6)
+        self.assertEqual((cache.acertos, cache.falhas), (5, 1))
+        self.assertEqual(cache._geracoes, {})
+
+    def test_falha_na_geracao_libera_a_chave(self):
+        cache = self.abrir()
+
+        def falhar():
+            raise RuntimeError("LLM indisponível")
+
+        with self.assertRaises(RuntimeError):
+            cache.obter_ou_gerar("k", falhar)
+        self.assertEqual(cache.obter_ou_gerar("k", lambda: "ok"), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
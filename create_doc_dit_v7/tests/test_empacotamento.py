@@ -0,0 +1,67 @@
+import sys
+import unittest
+from pathlib import Path
+
+# Testes do empacotamento de blocos pequenos e da separação da resposta do lote (functions/empacotamento.py)
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from functions.empacotamento import agrupar_blocos, contar_tokens, montar_prompt_lote, separar_resposta_lote
+
+MODELO = "gpt-4o-mini"
+
+LOTE = [((1, 1), "x = 1"), ((1, 2), "y = 2"), ((1, 3), "z = 3")]
+
+
+class TestSepararRespostaLote(unittest.TestCase):
+    def test_json_com_texto_em_volta(self):
+        resposta = 'Segue:\n```json\n{"1.1": " Resumo um. ", "1.2": "Resumo dois.", "1.3": "Resumo três."}\n```'
+        self.assertEqual(
+            separar_resposta_lote(resposta, LOTE),
+            {(1, 1): "Resumo um.", (1, 2): "Resumo dois.", (1, 3): "Resumo três."},
+        )
+
+    def test_rotulos_com_texto_sao_normalizados(self):
+        resposta = '{"BLOCO 1.1": "Um.", "Seção 1.3": "Três."}'
+        self.assertEqual(separar_resposta_lote(resposta, LOTE), {(1, 1): "Um.", (1, 3): "Três."})
+
+    def test_secoes_ausentes_vazias_ou_invalidas_ficam_de_fora(self):
+        resposta = '{"1.1": "", "1.2": ["lista"], "1.3": "Três.", "9.9": "Outro lote."}'
+        self.assertEqual(separar_resposta_lote(resposta, LOTE), {(1, 3): "Três."})
+
+    def test_resposta_sem_json_valido(self):
+        for resposta in ("sem json", "{quebrado: ", '["1.1", "1.2"]', "}{"):
+            self.assertEqual(separar_resposta_lote(resposta, LOTE), {}, resposta)
+
+
+class TestMontarPromptLote(unittest.TestCase):
+    def test_cabecalhos_e_ordem_de_execucao(self):
+        prompt = montar_prompt_lote("Notebook", LOTE[:2], {(1, 1): 4, (1, 2): None})
+        self.assertIn("### BLOCO 1.1\n(ordem de execução no notebook: 4)\nx = 1", prompt)
+        self.assertIn("### BLOCO 1.2\ny = 2", prompt)
+        self.assertIn('"1.1", "1.2"', prompt)
+
+
+class TestAgruparBlocos(unittest.TestCase):
+    def test_blocos_grandes_ficam_sozinhos(self):
+        grande = "valor = 1\n" * 200
+        itens = [((1, 1), "a = 1"), ((1, 2), grande), ((1, 3), "b = 2"), ((1, 4), "c = 3")]
+        lotes = agrupar_blocos(itens, MODELO, limite_bloco_pequeno=50, orcamento_tokens=1000)
+        self.assertEqual([[chave for chave, _ in lote] for lote in lotes], [[(1, 1)], [(1, 2)], [(1, 3), (1, 4)]])
+
+    def test_orcamento_e_maximo_de_blocos(self):
+        itens = [((1, i), f"variavel_{i} = {i}") for i in range(1, 8)]
+        por_quantidade = agrupar_blocos(itens, MODELO, max_blocos=3)
+        self.assertEqual([len(lote) for lote in por_quantidade], [3, 3, 1])
+
+        tokens = contar_tokens(itens[0][1], MODELO)
+        por_tokens = agrupar_blocos(itens, MODELO, orcamento_tokens=2 * tokens + 1)
+        self.assertTrue(all(sum(contar_tokens(c, MODELO) for _, c in lote) <= 2 * tokens + 1 for lote in por_tokens))
+        self.assertEqual([chave for lote in por_tokens for chave, _ in lote], [chave for chave, _ in itens])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import logging
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Testes do manifesto da conversão incremental (functions/manifesto.py)
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from functions.manifesto import (
+    ARQUIVO_MANIFESTO, carregar_manifesto, planejar_conversao, registrar_conversoes,
+)
+
+VERSAO = "1"
+logger = logging.getLogger(__name__)
+
+
+class TestManifesto(unittest.TestCase):
+    def setUp(self):
+        pasta = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        self.notebooks = pasta / "notebooks"
+        self.markdown = pasta / "markdown"
+        self.notebooks.mkdir()
+
+    def criar_notebook(self, nome, conteudo="{}"):
+        caminho = self.notebooks / nome
+        caminho.write_text(conteudo, encoding="utf-8")
+        return caminho
+
+    def converter(self, notebooks, versao=VERSAO):
+        # Simula o conversor: grava o .md de cada pendente e registra no manifesto
+        pendentes, hashes, manifesto = planejar_conversao(notebooks, self.markdown, versao, logger)
+        self.markdown.mkdir(exist_ok=True)
+        for arquivo in pendentes:
+            (self.markdown / f"{arquivo.stem}.md").write_text("# md", encoding="utf-8")
+        registrar_conversoes(self.markdown, manifesto, pendentes, hashes, versao)
+        return pendentes
+
+    def test_so_novos_ou_alterados_sao_convertidos(self):
+        a, b = self.criar_notebook("a.ipynb"), self.criar_notebook("b.ipynb")
+        self.assertEqual(self.converter([a, b]), [a, b])
+        self.assertEqual(self.converter([a, b]), [])
+
+        self.criar_notebook("b.ipynb", '{"cells": []}')
+        self.assertEqual(self.converter([a, b]), [b])
+        self.assertEqual(self.converter([a, b], versao="2"), [a, b])
+
+        (self.markdown / "a.md").unlink()
+        self.assertEqual(self.converter([a, b], versao="2"), [a])
+
+    def test_notebook_excluido_remove_markdown_e_anexos(self):
+        a, b = self.criar_notebook("a.ipynb"), self.criar_notebook("b.ipynb")
+        self.converter([a, b])
+        anexos = self.markdown / "b_files"
+        anexos.mkdir()
+        (anexos / "figura.png").write_bytes(b"png")
+
+        b.unlink()
+        with self.assertLogs(logger, "INFO") as registros:
+            self.assertEqual(self.converter([a]), [])
+        self.assertFalse((self.markdown / "b.md").exists())
+        self.assertFalse(anexos.exists())
+        self.assertTrue((self.markdown / "a.md").exists())
+        self.assertEqual(set(carregar_manifesto(self.markdown)), {"a.ipynb"})
+        self.assertIn("b.md", registros.output[0])
+
+    def test_manifesto_corrompido_reconverte_tudo(self):
+        a = self.criar_notebook("a.ipynb")
+        self.converter([a])
+        (self.markdown / ARQUIVO_MANIFESTO).write_text("{quebrado", encoding="utf-8")
+        self.assertEqual(carregar_manifesto(self.markdown), {})
+        self.assertEqual(self.converter([a]), [a])
+
+
+if __name__ == "__main__":
+    unittest.main()
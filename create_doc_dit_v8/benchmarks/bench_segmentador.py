@@ -0,0 +1,55 @@
+import re
+import sys
+import time
+from pathlib import Path
+
+# Micro-benchmark: segmentador de passada única x as três passadas de regex usadas antes em main.py
+# Uso: python benchmarks/bench_segmentador.py [tamanho_mb]
+
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+from functions.segmentador_markdown import extrair_conteudo_markdown
+
+# Implementação anterior (criar_doc_com_conteudo até a versão com regex)
+#---------------------------------------------------------------------------------------------------------------------------------
+def limpar_linhas_irrelevantes(texto):
+    return "\n".join(
+        linha for linha in texto.splitlines() if not linha.strip().startswith(("|", "#"))
+    )
+
+def extrair_texto_sem_codigo(md_content):
+    return re.sub(r"```.*?```", "", md_content, flags=re.DOTALL).strip()
+
+def extrair_blocos_codigo(md_content):
+    return re.findall(r"```python(.*?)```", md_content, re.DOTALL)
+
+def extrair_com_regex(texto):
+    conteudo_md = limpar_linhas_irrelevantes(texto)
+    return extrair_texto_sem_codigo(conteudo_md), extrair_blocos_codigo(conteudo_md)
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def gerar_markdown(tamanho_mb):
+    amostras = sorted((base_dir / "markdown").glob("*.md"))
+    modelo = "\n\n".join(md.read_text(encoding="utf-8") for md in amostras)
+    repeticoes = max(1, int(tamanho_mb * 1024 * 1024 / len(modelo.encode("utf-8"))))
+    return "\n\n".join([modelo] * repeticoes)
+
+def medir(funcao, texto, rodadas=5):
+    tempos = []
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        resultado = funcao(texto)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+if __name__ == "__main__":
+    for tamanho_mb in [float(a) for a in sys.argv[1:]] or [1, 4, 16]:
+        texto = gerar_markdown(tamanho_mb)
+        t_regex, (_, codigos_regex) = medir(extrair_com_regex, texto)
+        t_segmentador, (_, codigos_segmentador) = medir(extrair_conteudo_markdown, texto)
+        print(
+            f"{len(texto) / (1024 * 1024):6.1f} MB | regex: {t_regex * 1000:8.1f} ms | "
+            f"segmentador: {t_segmentador * 1000:8.1f} ms | "
+            f"blocos: {len(codigos_regex)} x {len(codigos_segmentador)}"
+        )
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Cache persistente (SQLite) das respostas do LLM.
+# A chave é o hash de tudo que influencia a resposta: modelo, temperatura, versão do prompt e conteúdo.
+# Quando o tamanho total passa de tamanho_max_bytes, as entradas acessadas há mais tempo são removidas (LRU).
+# O banco pode ser compartilhado por várias execuções (jobs da interface, processos): o tamanho total é sempre
+# lido do banco, dentro da mesma transação que grava e remove, e nunca guardado na conexão.
+class CacheLLM:
+    def __init__(self, caminho: Path, tamanho_max_bytes=200 * 1024 * 1024):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.tamanho_max_bytes = tamanho_max_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self.removidos = 0
+        self._lock = threading.Lock()
+        self._lock_geracoes = threading.Lock()
+        self._geracoes = {}  # chave -> [lock da geração, threads usando o lock]
+        self._conexao = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )
+        """)
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON respostas (ultimo_acesso)")
+        self._conexao.commit()
+
+    @staticmethod
+    def chave(*partes):
+        conteudo = json.dumps(partes, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def _ler(self, chave):
+        with self._lock:
+            linha = self._conexao.execute("SELECT valor FROM respostas WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return None
+            self._conexao.execute("UPDATE respostas SET ultimo_acesso = ? WHERE chave = ?", (time.time(), chave))
+            self._conexao.commit()
+            return linha[0]
+
+    def _contar(self, acerto):
+        with self._lock:
+            if acerto:
+                self.acertos += 1
+            else:
+                self.falhas += 1
+
+    def obter(self, chave):
+        valor = self._ler(chave)
+        self._contar(valor is not None)
+        return valor
+
+    def gravar(self, chave, valor):
+        tamanho = len(valor.encode("utf-8"))
+        with self._lock:
+            # BEGIN IMMEDIATE reserva a escrita no banco: outra conexão não grava entre a soma e as remoções
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO respostas (chave, valor, tamanho, ultimo_acesso) VALUES (?, ?, ?, ?)",
+                    (chave, valor, tamanho, time.time())
+                )
+                self._remover_excedente()
+                self._conexao.commit()
+            except BaseException:
+                self._conexao.rollback()
+                raise
+
+    @contextmanager
+    def _geracao(self, chave):
+        # Um lock por chave, criado sob demanda e descartado quando nenhuma thread o usa
+        with self._lock_geracoes:
+            entrada = self._geracoes.setdefault(chave, [threading.Lock(), 0])
+            entrada[1] += 1
+        try:
+            with entrada[0]:
+                yield
+        finally:
+            with self._lock_geracoes:
+                entrada[1] -= 1
+                if not entrada[1]:
+                    del self._geracoes[chave]
+
+    def obter_ou_gerar(self, chave, gerar):
+        valor = self._ler(chave)
+        if valor is None:
+            # Threads que erram a mesma chave esperam a primeira gerar e reaproveitam o valor gravado,
+            # em vez de chamarem o LLM em paralelo para a mesma resposta
+            with self._geracao(chave):
+                valor = self._ler(chave)
+                if valor is None:
+                    self._contar(False)
+                    valor = gerar()
+                    self.gravar(chave, valor)
+                    return valor
+        self._contar(True)
+        return valor
+
+    def _tamanho_total(self):
+        return self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+
+    def _remover_excedente(self):
+        # Chamado dentro da transação de gravar: a soma inclui o que outras execuções gravaram no banco
+        excedente = self._tamanho_total() - self.tamanho_max_bytes
+        while excedente > 0:
+            linhas = self._conexao.execute(
+                "SELECT chave, tamanho FROM respostas ORDER BY ultimo_acesso LIMIT 100"
+            ).fetchall()
+            if not linhas:
+                break
+            for chave, tamanho in linhas:
+                if excedente <= 0:
+                    break
+                self._conexao.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                excedente -= tamanho
+                self.removidos += 1
+
+    def registrar_estatisticas(self, logger=logger):
+        total = self.acertos + self.falhas
+        taxa = (self.acertos / total * 100) if total else 0.0
+        logger.info("========== CACHE LLM ==========")
+        logger.info(f"Acertos: {self.acertos}, Falhas: {self.falhas}, Taxa de acerto: {taxa:.1f}%")
+        with self._lock:
+            tamanho = self._tamanho_total()
+        logger.info(f"Removidos (LRU): {self.removidos}, Tamanho: {tamanho / (1024 * 1024):.2f} MB")
+        logger.info("===============================")
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
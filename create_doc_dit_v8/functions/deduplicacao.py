@@ -0,0 +1,126 @@
+import hashlib
+import io
+import re
+import tokenize
+
+# Índice de blocos de código repetidos entre notebooks (ex.: "%run ../00_config/ingestion_function",
+# a configuração de container_target/delta_file e o widget "reprocessar"), para que cada bloco
+# distinto seja resumido uma única vez por execução.
+# - Igualdade: hash do código normalizado, sem comentários e sem diferença de espaços/quebras de linha;
+# - Quase iguais (opcional, similaridade > 0): MinHash sobre trigramas de tokens, com LSH em faixas para
+#   comparar só os candidatos; a similaridade de Jaccard estimada precisa atingir o limite informado.
+# O primeiro bloco de cada grupo, na ordem do documento, é o representante: só ele vai para o LLM.
+
+_MAGICO = re.compile(r"^\s*[%!]")  # comandos mágicos (%run, %pip, !ls) não são Python válido
+_IGNORADOS = {tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.ENCODING, tokenize.ENDMARKER}
+
+NUM_PERMUTACOES = 64
+FAIXAS = 16  # 16 faixas de 4 linhas: pares com similaridade >= 0,8 viram candidatos com ~99% de chance
+TAMANHO_SHINGLE = 3
+MIN_SHINGLES = 5  # blocos muito curtos só são agrupados por igualdade
+
+_PRIMO = (1 << 61) - 1
+_COEFICIENTES = [
+    (int.from_bytes(hashlib.blake2b(f"a{n}".encode(), digest_size=8).digest(), "big") % _PRIMO or 1,
+     int.from_bytes(hashlib.blake2b(f"b{n}".encode(), digest_size=8).digest(), "big") % _PRIMO)
+    for n in range(NUM_PERMUTACOES)
+]
+
+def normalizar_codigo(codigo):
+    # Uma linha por linha lógica, com os tokens separados por um espaço; indentação vira marcador
+    # para que blocos com estrutura diferente não se confundam
+    linhas = codigo.splitlines()
+    por_linha = {n: [" ".join(linha.split())] for n, linha in enumerate(linhas, start=1) if _MAGICO.match(linha)}
+    mascarado = "\n".join("" if n in por_linha else linha for n, linha in enumerate(linhas, start=1))
+
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(mascarado + "\n").readline):
+            if token.type in _IGNORADOS:
+                continue
+            if token.type == tokenize.INDENT:
+                texto = "⇥"
+            elif token.type == tokenize.DEDENT:
+                texto = "⇤"
+            else:
+                texto = token.string
+            por_linha.setdefault(token.start[0], []).append(texto)
+    except (tokenize.TokenError, SyntaxError):
+        # Código que não tokeniza (célula incompleta, outra linguagem): só remove comentários de linha inteira
+        por_linha = {
+            n: [" ".join(linha.split())]
+            for n, linha in enumerate(linhas, start=1)
+            if linha.strip() and not linha.lstrip().startswith("#")
+        }
+
+    return "\n".join(" ".join(por_linha[n]) for n in sorted(por_linha) if por_linha[n])
+
+def hash_codigo(codigo):
+    return hashlib.sha256(normalizar_codigo(codigo).encode("utf-8")).hexdigest()
+
+def assinatura_minhash(normalizado):
+    # Retorna None se o bloco tiver poucos trigramas para uma estimativa confiável
+    tokens = normalizado.split()
+    shingles = {" ".join(tokens[n:n + TAMANHO_SHINGLE]) for n in range(len(tokens) - TAMANHO_SHINGLE + 1)}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    valores = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles]
+    return tuple(min((a * v + b) % _PRIMO for v in valores) for a, b in _COEFICIENTES)
+
+def similaridade_estimada(assinatura_a, assinatura_b):
+    return sum(x == y for x, y in zip(assinatura_a, assinatura_b)) / NUM_PERMUTACOES
+
+class IndiceDeduplicacao:
+    def __init__(self, similaridade=0.0):
+        self.similaridade = similaridade
+        self.copias = {}         # {chave do representante: [chaves dos blocos que reaproveitam o resumo]}
+        self.representante = {}  # {chave: chave do representante}; o representante aponta para si mesmo
+        self._por_hash = {}
+        self._assinaturas = {}
+        self._faixas = {}
+
+    def adicionar(self, chave, codigo):
+        # Registra o bloco e retorna a chave do representante do grupo dele
+        normalizado = normalizar_codigo(codigo)
+        digest = hashlib.sha256(normalizado.encode("utf-8")).hexdigest()
+        representante = self._por_hash.get(digest)
+
+        assinatura = None
+        if representante is None and self.similaridade > 0:
+            assinatura = assinatura_minhash(normalizado)
+            if assinatura is not None:
+                representante = self._mais_parecido(assinatura)
+
+        if representante is None:
+            representante = chave
+            self._por_hash[digest] = chave
+            if assinatura is not None:
+                self._registrar_assinatura(chave, assinatura)
+        else:
+            self._por_hash.setdefault(digest, representante)
+            self.copias.setdefault(representante, []).append(chave)
+        self.representante[chave] = representante
+        return representante
+
+    def _faixas_da_assinatura(self, assinatura):
+        linhas = NUM_PERMUTACOES // FAIXAS
+        return [(n, assinatura[n * linhas:(n + 1) * linhas]) for n in range(FAIXAS)]
+
+    def _mais_parecido(self, assinatura):
+        candidatos = set()
+        for faixa in self._faixas_da_assinatura(assinatura):
+            candidatos.update(self._faixas.get(faixa, ()))
+        melhor, melhor_similaridade = None, self.similaridade
+        for candidato in candidatos:
+            similaridade = similaridade_estimada(assinatura, self._assinaturas[candidato])
+            if similaridade >= melhor_similaridade:
+                melhor, melhor_similaridade = candidato, similaridade
+        return melhor
+
+    def _registrar_assinatura(self, chave, assinatura):
+        self._assinaturas[chave] = assinatura
+        for faixa in self._faixas_da_assinatura(assinatura):
+            self._faixas.setdefault(faixa, []).append(chave)
+
+    @property
+    def repetidos(self):
+        return sum(len(chaves) for chaves in self.copias.values())
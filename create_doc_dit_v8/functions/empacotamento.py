@@ -0,0 +1,107 @@
+import json
+import logging
+import re
+from functools import lru_cache
+
+# Empacotamento de blocos de código pequenos em uma única chamada ao LLM.
+# Blocos consecutivos do mesmo notebook são agrupados até o orçamento de tokens;
+# o modelo devolve um JSON {"<idx>.<i>": "<resumo>"} que é separado de volta por seção.
+
+class _CodificadorAproximado:
+    # Usado quando o tiktoken não consegue carregar o encoding (máquina sem acesso à internet e
+    # sem TIKTOKEN_CACHE_DIR): estima ~4 caracteres por token
+    def encode(self, texto, disallowed_special=()):
+        return [texto[i:i + 4] for i in range(0, len(texto), 4)]
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+@lru_cache(maxsize=None)
+def obter_codificador(modelo):
+    import tiktoken
+    try:
+        try:
+            return tiktoken.encoding_for_model(modelo)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"[!] tiktoken indisponível ({e.__class__.__name__}); usando contagem aproximada de tokens.")
+        return _CodificadorAproximado()
+
+def contar_tokens(texto, modelo):
+    return len(obter_codificador(modelo).encode(texto, disallowed_special=()))
+
+def agrupar_blocos(itens, modelo, limite_bloco_pequeno=200, orcamento_tokens=3000, max_blocos=10):
+    # itens: lista de (chave, codigo) de um mesmo notebook, na ordem do documento.
+    # Retorna uma lista de lotes; blocos grandes ficam sozinhos em um lote de um item.
+    lotes, atual, tokens_atual = [], [], 0
+    for chave, codigo in itens:
+        tokens = contar_tokens(codigo, modelo)
+        if tokens > limite_bloco_pequeno:
+            if atual:
+                lotes.append(atual)
+                atual, tokens_atual = [], 0
+            lotes.append([(chave, codigo)])
+            continue
+        if atual and (tokens_atual + tokens > orcamento_tokens or len(atual) >= max_blocos):
+            lotes.append(atual)
+            atual, tokens_atual = [], 0
+        atual.append((chave, codigo))
+        tokens_atual += tokens
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+def _rotulo(chave):
+    idx, i = chave
+    return f"{idx}.{i}"
+
+def montar_prompt_lote(titulo, lote, ordens=None):
+    # ordens: {chave: ordem de execução da célula}, indicada abaixo do rótulo de cada bloco quando conhecida
+    ordens = ordens or {}
+    blocos = "\n\n".join(
+        f"### BLOCO {_rotulo(chave)}\n"
+        + (f"(ordem de execução no notebook: {ordens[chave]})\n" if ordens.get(chave) is not None else "")
+        + codigo.strip()
+        for chave, codigo in lote
+    )
+    rotulos = ", ".join(f'"{_rotulo(chave)}"' for chave, _ in lote)
+    return f"""
+Você é um assistente técnico responsável por gerar conteúdo para um Documento de Implementação Técnica (DIT), no padrão institucional da Minerva Foods.
+
+Seu objetivo é produzir um parágrafo de resumo técnico para CADA trecho de código Python abaixo, seguindo a estrutura e estilo de documentação formal do modelo DIT.
+
+### Instruções de formatação e estilo:
+
+- Os trechos fazem parte do notebook "{titulo}"; cada um é identificado por "### BLOCO <seção>", seguido, quando conhecida, da ordem de execução da célula no notebook (que pode diferir da ordem das seções).
+- Use linguagem **técnica**, **objetiva**, **profissional** e em **tom institucional**.
+- Cada resumo deve ser um único parágrafo e explicar apenas o seu trecho.
+- Não repita o código, apenas gere os resumos.
+
+### Trechos de código do notebook "{titulo}":
+
+{blocos}
+
+Responda **somente** com um objeto JSON válido, sem texto adicional, cujas chaves são as seções {rotulos} e os valores são os parágrafos de resumo correspondentes.
+"""
+
+def separar_resposta_lote(resposta, lote):
+    # Retorna {chave: resumo} para as seções encontradas na resposta; seções ausentes ficam de fora
+    # para que quem chama gere esses resumos individualmente.
+    inicio, fim = resposta.find("{"), resposta.rfind("}")
+    if inicio == -1 or fim <= inicio:
+        return {}
+    try:
+        dados = json.loads(resposta[inicio:fim + 1])
+    except ValueError:
+        return {}
+    if not isinstance(dados, dict):
+        return {}
+
+    normalizados = {re.sub(r"[^\d.]", "", str(k)): v for k, v in dados.items()}
+    resultados = {}
+    for chave, _ in lote:
+        valor = normalizados.get(_rotulo(chave))
+        if isinstance(valor, str) and valor.strip():
+            resultados[chave] = valor.strip()
+    return resultados
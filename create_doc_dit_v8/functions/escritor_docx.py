@@ -0,0 +1,137 @@
+import io
+import os
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from docx import Document
+from docx.oxml.ns import qn
+from lxml import etree
+
+# Saída do DIT em duas versões com a mesma interface:
+# - EscritorDocxMemoria: um único documento python-docx, salvo no final (comportamento original);
+# - EscritorDocxStreaming: cada seção é montada em um documento de rascunho, serializada direto no
+#   word/document.xml dentro do .docx e descartada; a memória fica limitada pela maior seção.
+# Uso: with escritor.secao() as doc: doc.add_heading(...); ...; no fim escritor.salvar() (ou descartar() em caso de erro)
+# Seções montadas fora do escritor (ex.: em outros processos, via montar_fragmento sobre escritor.rascunho)
+# entram com escritor.escrever_fragmento(xml), na ordem em que devem aparecer no documento.
+
+_MARCADOR = "DIT_CORPO"
+
+class EscritorDocxMemoria:
+    def __init__(self, modelo_bytes, caminho):
+        self.caminho = Path(caminho)
+        self.doc = Document(io.BytesIO(modelo_bytes))
+        self.rascunho = _modelo_sem_corpo(modelo_bytes)
+
+    @contextmanager
+    def secao(self):
+        yield self.doc
+
+    def escrever_fragmento(self, xml):
+        # Move os parágrafos do fragmento para o fim do corpo, antes do sectPr
+        corpo = self.doc.element.body
+        sect = corpo.find(qn("w:sectPr"))
+        for elemento in list(etree.fromstring(xml)):
+            if sect is not None:
+                sect.addprevious(elemento)
+            else:
+                corpo.append(elemento)
+
+    def salvar(self):
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.doc.save(self.caminho)
+
+    def descartar(self):
+        self.doc = None
+
+
+def _dividir_documento(xml):
+    # Separa o document.xml do modelo em (início até o fim do corpo atual, sectPr final + fechamento)
+    raiz = etree.fromstring(xml)
+    corpo = raiz.find(qn("w:body"))
+    posicao = len(corpo)
+    if posicao and corpo[-1].tag == qn("w:sectPr"):
+        posicao -= 1
+    corpo.insert(posicao, etree.Comment(_MARCADOR))
+    texto = etree.tostring(raiz, xml_declaration=True, encoding="UTF-8", standalone=True)
+    prefixo, sufixo = texto.split(f"<!--{_MARCADOR}-->".encode("utf-8"))
+    return prefixo, sufixo
+
+def _modelo_sem_corpo(modelo_bytes):
+    # Mesmo pacote (estilos, cabeçalho, rodapé), com o corpo vazio: base dos documentos de rascunho
+    doc = Document(io.BytesIO(modelo_bytes))
+    corpo = doc.element.body
+    for elemento in list(corpo):
+        if elemento.tag != qn("w:sectPr"):
+            corpo.remove(elemento)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def _xml_corpo(doc):
+    # <w:body> do rascunho serializado inteiro, sem o sectPr: as declarações de namespace ficam só
+    # na tag de abertura, e não repetidas em cada parágrafo
+    corpo = doc.element.body
+    for sect in corpo.findall(qn("w:sectPr")):
+        corpo.remove(sect)
+    return etree.tostring(corpo, encoding="UTF-8", xml_declaration=False)
+
+def _conteudo_corpo(xml):
+    # Só os filhos de <w:body>, para gravar direto no document.xml
+    if xml.endswith(b"/>") and xml.count(b">") == 1:
+        return b""
+    return xml[xml.index(b">") + 1:xml.rindex(b"</w:body>")]
+
+def montar_fragmento(rascunho, montar, *args):
+    # Executa montar(doc, *args) em um documento de rascunho e devolve o XML do corpo.
+    # Função de módulo para poder rodar em um ProcessPoolExecutor
+    doc = Document(io.BytesIO(rascunho))
+    montar(doc, *args)
+    return _xml_corpo(doc)
+
+class EscritorDocxStreaming:
+    def __init__(self, modelo_bytes, caminho):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._temporario = self.caminho.with_name(self.caminho.name + ".tmp")
+        self.rascunho = _modelo_sem_corpo(modelo_bytes)
+
+        # Copia as demais partes do modelo; o document.xml é o último e fica aberto para escrita
+        self._zip = zipfile.ZipFile(self._temporario, "w", zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(io.BytesIO(modelo_bytes)) as base:
+            for info in base.infolist():
+                if info.filename == "word/document.xml":
+                    documento = base.read(info)
+                else:
+                    self._zip.writestr(info.filename, base.read(info))
+        prefixo, self._sufixo = _dividir_documento(documento)
+        self._documento = self._zip.open("word/document.xml", "w", force_zip64=True)
+        self._documento.write(prefixo)
+
+    @contextmanager
+    def secao(self):
+        doc = Document(io.BytesIO(self.rascunho))
+        yield doc
+        self.escrever_fragmento(_xml_corpo(doc))
+
+    def escrever_fragmento(self, xml):
+        self._documento.write(_conteudo_corpo(xml))
+
+    def salvar(self):
+        self._documento.write(self._sufixo)
+        self._documento.close()
+        self._zip.close()
+        os.replace(self._temporario, self.caminho)
+
+    def descartar(self):
+        try:
+            self._documento.close()
+            self._zip.close()
+        finally:
+            self._temporario.unlink(missing_ok=True)
+
+
+def criar_escritor(modelo_bytes, caminho, streaming=False):
+    classe = EscritorDocxStreaming if streaming else EscritorDocxMemoria
+    return classe(modelo_bytes, caminho)
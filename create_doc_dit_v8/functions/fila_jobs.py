@@ -0,0 +1,118 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Fila de jobs em memória com um pool de workers (threads) no próprio processo.
+# executar_job(parametros, atualizar) recebe os parâmetros do job e uma função
+# atualizar(progresso=None, mensagem=None, evento=None, pasta=None) para publicar o andamento (evento: último
+# evento de progresso do pipeline, ver functions/progresso.py; pasta: pasta de trabalho do job, que não
+# pode ser removida enquanto ele executa, ver pastas_em_execucao); o valor retornado
+# vira o "resultado" do job (ex.: caminho do DIT gerado) e uma exceção marca o job como erro.
+STATUS_NA_FILA = "na_fila"
+STATUS_EXECUTANDO = "executando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+
+class FilaJobs:
+    def __init__(self, executar_job, num_workers=2, max_jobs_guardados=500):
+        self.executar_job = executar_job
+        self.max_jobs_guardados = max_jobs_guardados
+        self._fila = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"job-worker-{n}", daemon=True)
+            for n in range(max(1, num_workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submeter(self, **parametros):
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": STATUS_NA_FILA,
+                "progresso": 0.0,
+                "mensagem": "Aguardando na fila...",
+                "resultado": None,
+                "erro": None,
+                "evento": None,
+                "pasta": None,
+                "criado_em": time.time(),
+                "iniciado_em": None,
+                "finalizado_em": None,
+            }
+            self._descartar_antigos()
+        self._fila.put((job_id, parametros))
+        logger.info(f"[+] Job {job_id} enfileirado ({self._fila.qsize()} na fila).")
+        return job_id
+
+    def status(self, job_id):
+        # Cópia do estado do job (None se o id não existir)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            copia = dict(job)
+        if copia["status"] == STATUS_NA_FILA:
+            copia["posicao_fila"] = self._posicao(job_id)
+        return copia
+
+    def pastas_em_execucao(self):
+        # Pastas de trabalho informadas pelos jobs em execução (ex.: para a limpeza de pastas antigas pular)
+        with self._lock:
+            return {j["pasta"] for j in self._jobs.values() if j["status"] == STATUS_EXECUTANDO and j["pasta"]}
+
+    def _posicao(self, job_id):
+        with self._fila.mutex:
+            pendentes = [item[0] for item in self._fila.queue]
+        return pendentes.index(job_id) + 1 if job_id in pendentes else 0
+
+    def _atualizar(self, job_id, **campos):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(campos)
+
+    def _descartar_antigos(self):
+        # Mantém no máximo max_jobs_guardados jobs finalizados em memória
+        finalizados = sorted(
+            (j for j in self._jobs.values() if j["status"] in (STATUS_CONCLUIDO, STATUS_ERRO)),
+            key=lambda j: j["finalizado_em"]
+        )
+        for job in finalizados[:max(0, len(finalizados) - self.max_jobs_guardados)]:
+            del self._jobs[job["id"]]
+
+    def _worker(self):
+        while True:
+            job_id, parametros = self._fila.get()
+            self._atualizar(job_id, status=STATUS_EXECUTANDO, mensagem="Processando...", iniciado_em=time.time())
+
+            def atualizar(progresso=None, mensagem=None, evento=None, pasta=None, _job_id=job_id):
+                campos = {}
+                if progresso is not None:
+                    campos["progresso"] = max(0.0, min(1.0, float(progresso)))
+                if mensagem is not None:
+                    campos["mensagem"] = mensagem
+                if evento is not None:
+                    campos["evento"] = evento
+                if pasta is not None:
+                    campos["pasta"] = str(pasta)
+                self._atualizar(_job_id, **campos)
+
+            try:
+                resultado = self.executar_job(parametros, atualizar)
+                self._atualizar(
+                    job_id, status=STATUS_CONCLUIDO, progresso=1.0, resultado=resultado,
+                    mensagem="Concluído.", finalizado_em=time.time()
+                )
+                logger.info(f"[✓] Job {job_id} concluído.")
+            except Exception as e:
+                self._atualizar(job_id, status=STATUS_ERRO, erro=str(e), mensagem=f"Erro: {e}", finalizado_em=time.time())
+                logger.exception(f"[✗] Job {job_id} falhou: {e}")
+            finally:
+                self._fila.task_done()
@@ -0,0 +1,292 @@
+import logging
+import random
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Camada de limite de taxa e retentativas em volta do ChatOpenAI.
+# - Dois baldes de tokens, um de requisições e outro de tokens por minuto. Cada chamada reserva 1 requisição
+#   e a estimativa de tokens do prompt (tiktoken) mais a resposta esperada, e espera a vez se o balde
+#   estiver vazio. Depois da resposta, a reserva é corrigida com o uso real informado pela API.
+# - Os limites vêm de DIT_LIMITE_RPM/DIT_LIMITE_TPM e/ou dos cabeçalhos x-ratelimit-* de cada resposta,
+#   lidos por um event hook do httpx, inclusive nas respostas 429. A capacidade usada fica em MARGEM_COTA
+#   do limite da conta, para o fluxo se manter logo abaixo da cota em vez de alternar rajadas e 429.
+# - 429, 408/409, 5xx e falhas de conexão são repetidos com backoff exponencial e jitter, respeitando o
+#   Retry-After. Um 429 pausa todas as chamadas, não só a que falhou.
+# - Disjuntor: após falhas seguidas de indisponibilidade (5xx, conexão) o circuito abre e ninguém chama a API
+#   durante a pausa; depois uma única chamada de teste decide se ele fecha (qualquer resposta da API, inclusive
+#   429) ou reabre com o dobro da pausa. Aberto muitas vezes seguidas, falha na hora com CircuitoAberto até
+#   o fim de uma pausa longa, e então volta a testar.
+
+MARGEM_COTA = 0.9
+
+_DURACAO = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIDADES = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def duracao_em_segundos(texto):
+    # Formato dos cabeçalhos x-ratelimit-reset-*: "1s", "6m0s", "20ms", "1h2m3.5s"
+    if texto is None:
+        return None
+    try:
+        return float(texto)
+    except ValueError:
+        partes = _DURACAO.findall(texto)
+        return sum(float(valor) * _UNIDADES[unidade] for valor, unidade in partes) if partes else None
+
+def erro_retentavel(erro):
+    import openai
+    if isinstance(erro, openai.APIConnectionError):  # inclui APITimeoutError
+        return True
+    status = getattr(erro, "status_code", None)
+    if status == 429 and getattr(erro, "code", None) == "insufficient_quota":
+        return False  # sem crédito na conta: repetir não resolve
+    return status in (408, 409, 429) or (status is not None and status >= 500)
+
+def espera_sugerida(erro):
+    # Retry-After (ou o reset do limite) informado na resposta de erro, em segundos
+    resposta = getattr(erro, "response", None)
+    cabecalhos = getattr(resposta, "headers", None) or {}
+    if cabecalhos.get("retry-after-ms"):
+        return float(cabecalhos["retry-after-ms"]) / 1000
+    esperas = [
+        duracao_em_segundos(cabecalhos.get(nome))
+        for nome in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    esperas = [espera for espera in esperas if espera is not None]
+    return max(esperas) if esperas else None
+
+
+class CircuitoAberto(RuntimeError):
+    pass
+
+
+class BaldeTokens:
+    # Capacidade por minuto, reposta continuamente; capacidade None = limite ainda desconhecido (não espera)
+    def __init__(self, por_minuto=None):
+        self._lock = threading.Lock()
+        self.capacidade = None
+        self.nivel = 0.0
+        self._atualizado = time.monotonic()
+        if por_minuto:
+            self.definir_capacidade(por_minuto)
+
+    def _repor(self):
+        agora = time.monotonic()
+        if self.capacidade:
+            self.nivel = min(self.capacidade, self.nivel + (agora - self._atualizado) * self.capacidade / 60)
+        self._atualizado = agora
+
+    def definir_capacidade(self, por_minuto):
+        with self._lock:
+            self._repor()
+            self.nivel = por_minuto if self.capacidade is None else min(self.nivel, por_minuto)
+            self.capacidade = por_minuto
+
+    def reservar(self, quantidade):
+        # Desconta a quantidade na hora (o nível pode ficar negativo) e retorna a espera, em segundos, até ela
+        # estar coberta: as reservas seguintes entram na fila atrás desta, sem rajadas
+        with self._lock:
+            if not self.capacidade:
+                return 0.0
+            self._repor()
+            self.nivel -= quantidade
+            return max(0.0, -self.nivel * 60 / self.capacidade)
+
+    def ajustar(self, diferenca):
+        # Devolve (diferenca > 0) ou cobra (diferenca < 0) a diferença entre o reservado e o usado
+        with self._lock:
+            if self.capacidade:
+                self._repor()
+                self.nivel = min(self.capacidade, self.nivel + diferenca)
+
+    def limitar(self, restante):
+        # O servidor informou quanto resta da cota: o balde não pode ter mais do que isso
+        with self._lock:
+            if self.capacidade:
+                self._repor()
+                self.nivel = min(self.nivel, restante)
+
+
+class Disjuntor:
+    # fechado: chamadas livres; abre após falhas_para_abrir falhas seguidas de indisponibilidade.
+    # aberto: ninguém chama a API até o fim da pausa, que dobra a cada reabertura (até pausa_max).
+    # meio-aberto: uma única chamada de teste; ela sempre termina em sucesso() (fecha), falha() (reabre)
+    # ou liberar() (interrompida: outra thread testa).
+    # Depois de max_aberturas seguidas, as chamadas falham na hora com CircuitoAberto em vez de esperar,
+    # até o fim de uma pausa de pausa_max; aí uma nova chamada de teste é liberada. O circuito nunca fica
+    # aberto de vez: o cliente é reaproveitado entre execuções (interface)
+    def __init__(self, falhas_para_abrir=5, pausa=30.0, pausa_max=300.0, max_aberturas=4):
+        self.falhas_para_abrir = falhas_para_abrir
+        self.pausa = pausa
+        self.pausa_max = pausa_max
+        self.max_aberturas = max_aberturas
+        self.estado = "fechado"  # fechado, aberto ou meio-aberto
+        self.falhas = 0
+        self.aberturas = 0
+        self._aberto_ate = 0.0
+        self._condicao = threading.Condition()
+
+    def entrar(self):
+        # Bloqueia enquanto o circuito está aberto ou outra thread faz a chamada de teste.
+        # Retorna True se esta chamada é a de teste
+        with self._condicao:
+            while True:
+                if self.estado == "fechado":
+                    return False
+                restante = self._aberto_ate - time.monotonic()
+                if self.estado == "aberto" and restante <= 0:
+                    self.estado = "meio-aberto"
+                    return True
+                if self.aberturas > self.max_aberturas:
+                    raise CircuitoAberto(
+                        f"API indisponível: circuito aberto {self.aberturas} vez(es) seguidas; "
+                        f"nova tentativa liberada em {max(0.0, restante):.0f}s."
+                    )
+                self._condicao.wait(restante if self.estado == "aberto" else None)
+
+    def sucesso(self):
+        with self._condicao:
+            if self.estado != "fechado":
+                logger.info("[✓] Circuito fechado: a API voltou a responder.")
+            self.estado = "fechado"
+            self.falhas = 0
+            self.aberturas = 0
+            self._condicao.notify_all()
+
+    def falha(self):
+        with self._condicao:
+            self.falhas += 1
+            if self.estado == "meio-aberto" or (self.estado == "fechado" and self.falhas >= self.falhas_para_abrir):
+                self.aberturas += 1
+                if self.aberturas > self.max_aberturas:
+                    pausa = self.pausa_max
+                else:
+                    pausa = min(self.pausa_max, self.pausa * 2 ** (self.aberturas - 1))
+                self.estado = "aberto"
+                self.falhas = 0
+                self._aberto_ate = time.monotonic() + pausa
+                logger.warning(f"[!] Circuito aberto após falhas seguidas na API; nova tentativa em {pausa:.1f}s.")
+                self._condicao.notify_all()
+
+    def liberar(self):
+        # A chamada de teste terminou sem resposta da API (ex.: interrompida): a próxima thread testa
+        with self._condicao:
+            if self.estado == "meio-aberto":
+                self.estado = "aberto"
+                self._aberto_ate = time.monotonic()
+                self._condicao.notify_all()
+
+
+class ClienteLLMResiliente:
+    # Mesma interface usada pelo pipeline: invoke(prompt) -> resposta do ChatOpenAI.
+    # criar_llm(http_client) cria o ChatOpenAI com esse http_client (para os cabeçalhos de limite chegarem
+    # aos baldes) e max_retries=0 (as retentativas ficam aqui)
+    def __init__(self, criar_llm, modelo, rpm=0, tpm=0, max_tentativas=6, espera_base=1.0, espera_max=60.0,
+                 tokens_resposta=500, disjuntor=None):
+        self.modelo = modelo
+        self.rpm, self.tpm = rpm, tpm
+        self.requisicoes = BaldeTokens(rpm * MARGEM_COTA if rpm else None)
+        self.tokens = BaldeTokens(tpm * MARGEM_COTA if tpm else None)
+        self.max_tentativas = max(1, max_tentativas)
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.tokens_resposta = tokens_resposta
+        self.disjuntor = disjuntor or Disjuntor()
+        self.retentativas = 0
+        self._pausado_ate = 0.0
+        self._lock = threading.Lock()
+        self._http = self.cliente_http()
+        self.llm = criar_llm(self._http)
+
+    def cliente_http(self):
+        import openai
+        return openai.DefaultHttpxClient(event_hooks={"response": [self.registrar_cabecalhos]})
+
+    def fechar(self):
+        # Fecha as conexões HTTP do cliente (ex.: descartado do cache de clientes em main.py)
+        self._http.close()
+
+    def registrar_cabecalhos(self, resposta_http):
+        # Event hook do httpx: roda para toda resposta da API, antes do openai tratar erros
+        cabecalhos = resposta_http.headers
+        for balde, sufixo, configurado in ((self.requisicoes, "requests", self.rpm), (self.tokens, "tokens", self.tpm)):
+            try:
+                limite = float(cabecalhos[f"x-ratelimit-limit-{sufixo}"])
+                restante = float(cabecalhos[f"x-ratelimit-remaining-{sufixo}"])
+            except (KeyError, ValueError):
+                continue
+            # Um limite configurado menor que o da conta (ex.: cota dividida com outros sistemas) prevalece
+            limite = min(limite, configurado) if configurado else limite
+            balde.definir_capacidade(limite * MARGEM_COTA)
+            balde.limitar(restante)
+
+    def _aguardar_vez(self, estimativa):
+        with self._lock:
+            pausa = self._pausado_ate - time.monotonic()
+        if pausa > 0:
+            time.sleep(pausa)
+        espera = max(self.requisicoes.reservar(1), self.tokens.reservar(estimativa))
+        if espera > 0:
+            time.sleep(espera)
+
+    def _pausar(self, segundos):
+        with self._lock:
+            self._pausado_ate = max(self._pausado_ate, time.monotonic() + segundos)
+
+    def espera_retentativa(self, tentativa, erro=None):
+        # Backoff exponencial com jitter completo; nunca menos que o Retry-After informado pela API
+        teto = min(self.espera_max, self.espera_base * 2 ** (tentativa - 1))
+        espera = random.uniform(0, teto)
+        sugerida = espera_sugerida(erro) if erro is not None else None
+        return max(espera, min(sugerida, self.espera_max)) if sugerida else espera
+
+    def invoke(self, prompt):
+        from functions.empacotamento import contar_tokens
+        from functions.progresso import tokens_da_resposta
+
+        estimativa = contar_tokens(prompt, self.modelo) + self.tokens_resposta
+        for tentativa in range(1, self.max_tentativas + 1):
+            teste = self.disjuntor.entrar()
+            try:
+                self._aguardar_vez(estimativa)
+                resposta = self.llm.invoke(prompt)
+            except Exception as erro:
+                retentavel = erro_retentavel(erro)
+                limite_excedido = getattr(erro, "status_code", None) == 429
+                # Todo resultado passa pelo disjuntor (a chamada de teste não pode ficar sem desfecho).
+                # 429 e erros da própria requisição (ex.: chave inválida) mostram que a API está respondendo;
+                # o excesso de velocidade é tratado pela pausa e pelos baldes
+                if retentavel and not limite_excedido:
+                    self.disjuntor.falha()
+                else:
+                    self.disjuntor.sucesso()
+                if not retentavel:
+                    raise
+                # Requisição recusada não consome a cota: devolve a reserva
+                self.requisicoes.ajustar(1)
+                self.tokens.ajustar(estimativa)
+                if tentativa == self.max_tentativas:
+                    raise
+                espera = self.espera_retentativa(tentativa, erro)
+                if limite_excedido:
+                    self._pausar(espera)
+                with self._lock:
+                    self.retentativas += 1
+                logger.warning(
+                    f"[!] {erro.__class__.__name__} na chamada ao LLM (tentativa {tentativa}/{self.max_tentativas}); "
+                    f"nova tentativa em {espera:.1f}s."
+                )
+                time.sleep(espera)
+                continue
+            except BaseException:
+                if teste:
+                    self.disjuntor.liberar()
+                raise
+
+            self.disjuntor.sucesso()
+            usados = tokens_da_resposta(resposta)
+            if usados:
+                self.tokens.ajustar(estimativa - usados)
+            return resposta
@@ -3,7 +3,7 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
-logger = logging.getLogger(__name__)
+FORMATO = "%(asctime)s - %(levelname)s - %(message)s"
 
 def configurar_logger(base_dir: Path):
     log_dir = base_dir / "log"
@@ -12,14 +12,23 @@ def configurar_logger(base_dir: Path):
     log_filename = datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + ".log"
     log_path = log_dir / log_filename
 
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_path),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    # Um logger por execução, com handlers próprios e sem mexer na raiz: execuções simultâneas no mesmo
+    # processo (interface) gravam cada uma no seu arquivo. Fica fora do registro do logging para não acumular
+    # um logger por execução; fechar_logger fecha o arquivo ao fim da execução
+    logger = logging.Logger(f"dit.{log_path.stem}", logging.DEBUG)
+    formato = logging.Formatter(FORMATO)
+    for handler in (logging.FileHandler(log_path), logging.StreamHandler(sys.stdout)):
+        handler.setFormatter(formato)
+        logger.addHandler(handler)
+
+    # Módulos compartilhados entre as execuções (ex.: retentativas do cliente do LLM) registram no console;
+    # sem force, basicConfig só configura a raiz se ninguém a configurou antes
+    logging.basicConfig(level=logging.INFO, format=FORMATO, handlers=[logging.StreamHandler(sys.stdout)])
 
     logger.info(f"Arquivo de log criado: {log_path}")
     return logger
+
+def fechar_logger(logger):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
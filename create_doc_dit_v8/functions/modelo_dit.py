@@ -0,0 +1,165 @@
+import io
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt, RGBColor
+
+# Modelo do DIT: doc/DIT_model.docx é lido uma vez por processo, o corpo é descartado (ficam estilos,
+# cabeçalho/rodapé e configuração de página) e os estilos do DIT são registrados nele.
+# A formatação fica nos estilos; parágrafos e runs só referenciam o nome do estilo.
+COR_DIT = RGBColor(0x2D, 0x5B, 0xFF)  # Azul tecnológico
+COR_CODIGO = RGBColor(0x40, 0x40, 0x40)
+FONTE_DIT = "Arial Nova"
+
+ESTILO_TITULO = "DIT Heading"
+ESTILO_CORPO = "DIT Body"
+ESTILO_CODIGO = "DIT Code"
+ESTILO_CODIGO_CARACTERE = "DIT Code Char"  # runs de código: blocos e `trechos` citados no texto
+
+NIVEIS_TITULO = 4  # Heading 1 a 4, usados por doc.add_heading
+
+_CODIGO_EM_LINHA = re.compile(r"`([^`\n]+)`")
+
+def _definir_fonte(estilo, tamanho=None, cor=None, negrito=None):
+    estilo.font.name = FONTE_DIT
+    # Sem o eastAsia alguns ambientes ignoram a fonte; definido uma vez no estilo, não em cada run
+    estilo.element.get_or_add_rPr().get_or_add_rFonts().set(qn("w:eastAsia"), FONTE_DIT)
+    if tamanho is not None:
+        estilo.font.size = Pt(tamanho)
+    if cor is not None:
+        estilo.font.color.rgb = cor
+    if negrito is not None:
+        estilo.font.bold = negrito
+
+def _estilo_paragrafo(doc, nome, base="Normal"):
+    estilos = doc.styles
+    try:
+        return estilos[nome]
+    except KeyError:
+        estilo = estilos.add_style(nome, WD_STYLE_TYPE.PARAGRAPH)
+        estilo.base_style = estilos[base]
+        return estilo
+
+def _estilo_caractere(doc, nome):
+    estilos = doc.styles
+    try:
+        return estilos[nome]
+    except KeyError:
+        return estilos.add_style(nome, WD_STYLE_TYPE.CHARACTER)
+
+def registrar_estilos(doc):
+    # Alguns modelos gravam "Heading 1" com maiúscula; o python-docx só encontra os nomes internos ("heading 1")
+    for estilo in doc.styles:
+        nome = estilo.element.name_val or ""
+        if nome.startswith("Heading ") and nome[8:].isdigit():
+            estilo.element.name_val = nome.lower()
+
+    titulo = _estilo_paragrafo(doc, ESTILO_TITULO)
+    _definir_fonte(titulo, cor=COR_DIT, negrito=True)
+
+    for nivel in range(1, NIVEIS_TITULO + 1):
+        estilo = _estilo_paragrafo(doc, f"Heading {nivel}", base=f"Heading {nivel - 1}" if nivel > 1 else "Normal")
+        _definir_fonte(estilo, cor=COR_DIT)
+
+    corpo = _estilo_paragrafo(doc, ESTILO_CORPO)
+    _definir_fonte(corpo, tamanho=11, cor=RGBColor(0, 0, 0))
+    corpo.paragraph_format.line_spacing = 1.15
+    corpo.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+
+    codigo = _estilo_paragrafo(doc, ESTILO_CODIGO)
+    _definir_fonte(codigo, tamanho=9, cor=COR_CODIGO)
+    codigo.paragraph_format.line_spacing = 1.15
+
+    codigo_caractere = _estilo_caractere(doc, ESTILO_CODIGO_CARACTERE)
+    _definir_fonte(codigo_caractere, tamanho=9, cor=COR_CODIGO)
+
+    # O sumário usa "List Number"; modelos sem esse estilo recebem um equivalente sem numeração automática
+    _estilo_paragrafo(doc, "List Number", base=ESTILO_CORPO)
+
+@lru_cache(maxsize=4)
+def _modelo_em_bytes(caminho, modificado_em):
+    # modificado_em entra na chave: um modelo editado é relido na próxima chamada
+    doc = Document(caminho) if caminho else Document()
+    corpo = doc.element.body
+    for elemento in list(corpo):
+        if elemento.tag != qn("w:sectPr"):
+            corpo.remove(elemento)
+    registrar_estilos(doc)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def novo_documento(caminho_modelo=None):
+    # Documento vazio com os estilos do DIT; sem o modelo em disco, parte do modelo padrão do python-docx
+    caminho = Path(caminho_modelo) if caminho_modelo else None
+    if caminho is not None and caminho.exists():
+        return Document(io.BytesIO(_modelo_em_bytes(str(caminho), caminho.stat().st_mtime_ns)))
+    return Document(io.BytesIO(_modelo_em_bytes(None, 0)))
+
+def adicionar_texto(doc, texto, estilo=ESTILO_CORPO):
+    # Parágrafo de texto em que os `trechos` entre crases viram runs no estilo de código (sem as crases)
+    paragrafo = doc.add_paragraph(style=estilo)
+    for n, parte in enumerate(_CODIGO_EM_LINHA.split(texto)):
+        if parte:
+            paragrafo.add_run(parte, style=ESTILO_CODIGO_CARACTERE if n % 2 else None)
+    return paragrafo
+
+def adicionar_secao_notebook(doc, idx, titulo, texto, codigos, resumos):
+    # Seção de um notebook: título, texto e, para cada célula, resumo e código fonte
+    doc.add_page_break()
+    doc.add_heading(f"{idx}. {titulo}", level=1)
+
+    if texto:
+        adicionar_texto(doc, texto)
+
+    for i, codigo in enumerate(codigos, start=1):
+        resumo = resumos[(idx, i)]
+        doc.add_heading(f"\n{idx}.{i} Resumo do Código", level=3)
+        adicionar_texto(doc, resumo)
+
+        doc.add_heading("Código Fonte", level=4)
+        doc.add_paragraph(style=ESTILO_CODIGO).add_run(codigo.strip(), style=ESTILO_CODIGO_CARACTERE)
+
+def _run_campo(paragrafo, tipo=None, instrucao=None, texto=None):
+    run = OxmlElement("w:r")
+    if tipo:
+        elemento = OxmlElement("w:fldChar")
+        elemento.set(qn("w:fldCharType"), tipo)
+        if tipo == "begin":
+            elemento.set(qn("w:dirty"), "true")
+    elif instrucao:
+        elemento = OxmlElement("w:instrText")
+        elemento.set(qn("xml:space"), "preserve")
+        elemento.text = instrucao
+    else:
+        elemento = OxmlElement("w:t")
+        elemento.text = texto
+    run.append(elemento)
+    paragrafo._p.append(run)
+
+def adicionar_campo_sumario(doc, niveis="1-1"):
+    # Campo TOC do Word ligado aos estilos de título (Heading 1..n); o Word calcula as páginas ao abrir
+    # o documento (ver ativar_atualizacao_campos) ou com "Atualizar campo".
+    # Só o nível 1 (um título por notebook): os níveis 3 e 4 se repetem em cada célula ("n.i Resumo do
+    # Código", "Código Fonte") e transformariam o sumário em milhares de linhas iguais
+    paragrafo = doc.add_paragraph(style=ESTILO_CORPO)
+    _run_campo(paragrafo, tipo="begin")
+    _run_campo(paragrafo, instrucao=f' TOC \\o "{niveis}" \\h \\z \\u ')
+    _run_campo(paragrafo, tipo="separate")
+    _run_campo(paragrafo, texto='Clique com o botão direito e escolha "Atualizar campo" para gerar o sumário.')
+    _run_campo(paragrafo, tipo="end")
+
+def ativar_atualizacao_campos(doc):
+    # <w:updateFields/> em settings.xml: o Word oferece atualizar os campos (sumário) ao abrir o arquivo
+    settings = doc.settings.element
+    if settings.find(qn("w:updateFields")) is None:
+        atualizar = OxmlElement("w:updateFields")
+        atualizar.set(qn("w:val"), "true")
+        settings.append(atualizar)
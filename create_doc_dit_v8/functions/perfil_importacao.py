@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+# Custo de importação dos módulos, medido em um interpretador novo com "python -X importtime"
+# (a medição no próprio processo seria distorcida pelo que já está carregado).
+# Cada linha do stderr tem o formato "import time: <próprio us> | <acumulado us> | <  ...><módulo>";
+# só os módulos importados diretamente (sem recuo) entram no relatório, com o tempo acumulado.
+
+def medir_importacoes(modulos, cwd=None):
+    # Retorna uma lista de (modulo, acumulado_ms, proprio_ms), do mais caro para o mais barato
+    codigo = "; ".join(f"import {modulo}" for modulo in modulos)
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar os módulos: {processo.stderr.strip().splitlines()[-1:]}")
+
+    medicoes = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "imported package" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|", 2)
+        # Um espaço separa a barra do nome; recuos maiores indicam importações aninhadas
+        if nome[1:2] == " ":
+            continue
+        medicoes.append((nome.strip(), int(acumulado) / 1000, int(proprio) / 1000))
+    return sorted(medicoes, key=lambda m: m[1], reverse=True)
+
+def relatorio_importacoes(medicoes, limite=15):
+    linhas = ["========== IMPORTAÇÕES ==========", f"{'Módulo':<40}{'Acumulado (ms)':>16}{'Próprio (ms)':>14}"]
+    for nome, acumulado, proprio in medicoes[:limite]:
+        linhas.append(f"{nome:<40}{acumulado:>16.1f}{proprio:>14.1f}")
+    linhas.append(f"Total: {sum(m[1] for m in medicoes):.1f} ms em {len(medicoes)} módulo(s) de nível superior")
+    linhas.append("=================================")
+    return "\n".join(linhas)
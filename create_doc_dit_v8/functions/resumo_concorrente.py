@@ -0,0 +1,34 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+# Executa todas as chamadas ao LLM de uma vez, limitadas por max_concorrencia.
+# tarefas: lista de (chave, args) onde chave identifica a posição no documento, ex.: (idx, i).
+# Retorna um dicionário {chave: resultado} e a ordem original é recuperada por quem chama.
+# ao_concluir(chave, resultado), se informado, é chamado a cada tarefa concluída (ex.: eventos de progresso).
+def gerar_resumos_concorrentes(tarefas, funcao, max_concorrencia=8, logger=logger, ao_concluir=None):
+    resultados = {}
+    if not tarefas:
+        return resultados
+
+    max_concorrencia = max(1, min(int(max_concorrencia), len(tarefas)))
+    logger.info(f"[⚙️] Gerando {len(tarefas)} resumo(s) com concorrência {max_concorrencia}...")
+
+    with ThreadPoolExecutor(max_workers=max_concorrencia, thread_name_prefix="resumo") as executor:
+        futuros = {executor.submit(funcao, *args): chave for chave, args in tarefas}
+        for futuro in as_completed(futuros):
+            chave = futuros[futuro]
+            try:
+                resultados[chave] = futuro.result()
+            except Exception:
+                # Cancela o que ainda não começou: uma falha interrompe a geração do documento
+                for pendente in futuros:
+                    pendente.cancel()
+                logger.exception(f"[✗] Erro ao gerar resumo {chave}")
+                raise
+            if ao_concluir is not None:
+                ao_concluir(chave, resultados[chave])
+
+    logger.info(f"[✓] {len(resultados)} resumo(s) gerado(s).")
+    return resultados
@@ -0,0 +1,88 @@
+import re
+from collections import namedtuple
+
+# Segmentador de markdown em uma única passada linear.
+# tipo: "prosa", "codigo", "tabela" ou "titulo"; linha_inicio/linha_fim: linhas (1-based, inclusivas);
+# linguagem: info string da cerca de código (```python, ~~~sql, ...) ou "" nos demais tipos.
+Segmento = namedtuple("Segmento", ["tipo", "texto", "linha_inicio", "linha_fim", "linguagem"])
+
+# Cerca de abertura: até 3 espaços, 3+ crases ou tis, e a linguagem opcional
+_ABERTURA = re.compile(r" {0,3}(`{3,}|~{3,})[ \t]*([^`\s]*)")
+
+_INICIO_CERCA = ("`", "~")
+
+LINGUAGENS_PYTHON = ("python", "py", "python3")
+
+def _linhas(texto):
+    # Percorre o texto sem criar a lista completa de linhas
+    inicio, tamanho = 0, len(texto)
+    while inicio < tamanho:
+        fim = texto.find("\n", inicio)
+        if fim == -1:
+            fim = tamanho
+        yield texto[inicio:fim].rstrip("\r")
+        inicio = fim + 1
+
+def segmentar_markdown(texto):
+    tipo_atual, linhas_atuais, inicio_atual, linguagem_atual = None, [], 0, ""
+    cerca = None
+
+    def fechar(linha_fim):
+        if tipo_atual is not None and linhas_atuais:
+            return Segmento(tipo_atual, "\n".join(linhas_atuais), inicio_atual, linha_fim, linguagem_atual)
+        return None
+
+    numero = 0
+    for numero, linha in enumerate(_linhas(texto), start=1):
+        if cerca is not None:
+            conteudo = linha.strip()
+            # Fecha com o mesmo caractere e pelo menos o mesmo comprimento da abertura
+            if conteudo and conteudo[0] == cerca[0] and len(conteudo) >= len(cerca) and conteudo == conteudo[0] * len(conteudo):
+                yield Segmento("codigo", "\n".join(linhas_atuais), inicio_atual, numero, linguagem_atual)
+                tipo_atual, linhas_atuais, cerca = None, [], None
+            else:
+                linhas_atuais.append(linha)
+            continue
+
+        conteudo = linha.lstrip()
+        primeiro = conteudo[:1]
+        abertura = _ABERTURA.match(linha) if primeiro in _INICIO_CERCA else None
+        if abertura:
+            segmento = fechar(numero - 1)
+            if segmento:
+                yield segmento
+            cerca = abertura.group(1)
+            tipo_atual, linhas_atuais, inicio_atual = "codigo", [], numero
+            linguagem_atual = abertura.group(2).lower()
+            continue
+
+        if primeiro == "#":
+            tipo = "titulo"
+        elif primeiro == "|":
+            tipo = "tabela"
+        else:
+            tipo = "prosa"
+
+        # Títulos são sempre segmentos de uma linha; prosa e tabelas agrupam linhas consecutivas
+        if tipo != tipo_atual or tipo == "titulo":
+            segmento = fechar(numero - 1)
+            if segmento:
+                yield segmento
+            tipo_atual, linhas_atuais, inicio_atual, linguagem_atual = tipo, [], numero, ""
+        linhas_atuais.append(linha)
+
+    # Cerca não fechada vai até o fim do arquivo, como no CommonMark
+    segmento = fechar(numero)
+    if segmento:
+        yield segmento
+
+def extrair_conteudo_markdown(texto, linguagens=LINGUAGENS_PYTHON):
+    # Retorna (texto, codigos) no formato usado pelo documento: prosa sem títulos/tabelas e
+    # os blocos de código nas linguagens indicadas
+    prosa, codigos = [], []
+    for segmento in segmentar_markdown(texto):
+        if segmento.tipo == "prosa":
+            prosa.append(segmento.texto)
+        elif segmento.tipo == "codigo" and segmento.linguagem in linguagens:
+            codigos.append(segmento.texto)
+    return "\n".join(prosa).strip(), codigos
@@ -1,68 +1,252 @@
-import gradio as gr
 import os
-import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
 
-# Função que transforma arquivos de texto em estrutura simulada de DIT
-def gerar_dit(token: str, diretorio: str):
-    if not token.strip():
-        return "Erro: Token não pode estar vazio.", None
+# Importado uma vez ao subir a interface: cada job reaproveita o pipeline já carregado
+import main
+from functions.fila_jobs import FilaJobs, STATUS_NA_FILA, STATUS_EXECUTANDO, STATUS_ERRO
 
-    if not os.path.isdir(diretorio):
-        return "Erro: Diretório inválido ou inexistente.", None
+# O pool que monta as seções (main.obter_pool_secoes) usa spawn, que reimporta este módulo em cada processo
+# filho: gradio, tkinter, a fila de jobs e a tela só são carregados/criados sob o if __name__ == "__main__"
 
-    arquivos = [f for f in os.listdir(diretorio) if f.endswith(".txt")]
-    if not arquivos:
-        return "Erro: Nenhum arquivo .txt encontrado no diretório.", None
+BASE_DIR = Path(__file__).resolve().parent
 
-    estrutura_dit = []
+# Cada execução roda em uma pasta de trabalho própria (notebooks/, markdown/, log/, doc/),
+# criada na pasta temporária do sistema; o cache de respostas do LLM continua compartilhado.
+PREFIXO_JOB = "dit_job_"
+CACHE_DIR = BASE_DIR / "cache"
+# Tempo (s) que o DIT gerado fica disponível para download antes da pasta do job ser removida
+JOB_TTL = int(os.getenv("DIT_JOB_TTL", "3600"))
+# Intervalo (s) entre as atualizações de status enviadas ao navegador
+INTERVALO_STATUS = float(os.getenv("DIT_INTERVALO_STATUS", "0.5"))
 
-    for arquivo in arquivos:
-        caminho = os.path.join(diretorio, arquivo)
+def limpar_jobs_antigos(em_execucao=()):
+    # em_execucao: pastas de jobs ainda rodando. Durante as chamadas ao LLM nada é gravado na pasta do job,
+    # então o mtime dela não indica se o job terminou
+    limite = time.time() - JOB_TTL
+    for job_dir in Path(tempfile.gettempdir()).glob(f"{PREFIXO_JOB}*"):
         try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                conteudo = f.read()
-            estrutura_dit.append({
-                "arquivo": arquivo,
-                "conteudo": conteudo.strip()
-            })
-        except Exception as e:
-            return f"Erro ao ler {arquivo}: {str(e)}", None
-
-    # Criação do arquivo JSON (DIT)
-    os.makedirs("saida", exist_ok=True)
-    caminho_saida = os.path.join("saida", "DIT_transformado.json")
-    with open(caminho_saida, "w", encoding="utf-8") as f:
-        json.dump(estrutura_dit, f, indent=2, ensure_ascii=False)
-
-    comentario = f"Transformação concluída: {len(arquivos)} arquivo(s) processado(s)."
-    return comentario, caminho_saida
-
-# Função para limpar os dados
+            if str(job_dir) in em_execucao:
+                continue
+            if job_dir.is_dir() and job_dir.stat().st_mtime < limite:
+                shutil.rmtree(job_dir, ignore_errors=True)
+        except OSError:
+            pass
+
+def selecionar_diretorio():
+    import tkinter as tk
+    from tkinter import filedialog
+
+    root = tk.Tk()
+    root.withdraw()
+    root.wm_attributes('-topmost', 1)
+    diretorio = filedialog.askdirectory(title="Selecione a pasta com os notebooks")
+    return diretorio if diretorio else ""
+
+def listar_notebooks(diretorio: str):
+    if not os.path.isdir(diretorio):
+        raise ValueError("Diretório inválido ou inexistente.")
+    arquivos = [f for f in os.listdir(diretorio) if f.endswith(".ipynb")]
+    if not arquivos:
+        raise ValueError("Nenhum arquivo .ipynb encontrado.")
+    return arquivos
+
+def descrever_evento(evento):
+    # Converte um evento do pipeline em (progresso 0-1, mensagem)
+    etapa = evento["etapa"]
+    if etapa == "inicio":
+        return 0.1, f"Iniciando: {evento['notebooks']} notebook(s)."
+    if etapa in ("sumario", "introducao"):
+        return (0.15 if etapa == "sumario" else 0.2), f"{etapa.capitalize()} gerado(a)."
+    if etapa == "leitura":
+        return 0.2, f"Lido {evento['notebook']} ({evento['celulas']} célula(s))."
+    if etapa == "resumo":
+        celulas = ", ".join(str(i) for i in evento["celulas"])
+        fracao = evento["concluidas"] / max(1, evento["total"])
+        return 0.2 + 0.75 * fracao, f"Resumos {evento['concluidas']}/{evento['total']} — {evento['notebook']} célula(s) {celulas}."
+    if etapa == "documento":
+        return 0.97, "Documento montado."
+    return None, None
+
+def executar_job(parametros, atualizar):
+    # Executado por um worker da fila: gera o DIT em uma pasta isolada e retorna o caminho do .docx
+    token, diretorio = parametros["token"], parametros["diretorio"]
+    limpar_jobs_antigos(FILA.pastas_em_execucao() if FILA else ())
+    arquivos = listar_notebooks(diretorio)
+
+    # Preparação do ambiente isolado do job
+    job_dir = Path(tempfile.mkdtemp(prefix=PREFIXO_JOB))
+    atualizar(pasta=job_dir)
+    try:
+        notebooks_dir = job_dir / "notebooks"
+        notebooks_dir.mkdir()
+        
+        # Cópia dos notebooks
+        atualizar(0.05, f"Copiando {len(arquivos)} notebook(s)...")
+        for arquivo in arquivos:
+            shutil.copy2(
+                os.path.join(diretorio, arquivo),
+                notebooks_dir / arquivo
+            )
+        
+        # Execução no próprio processo: o pipeline (langchain, python-docx, cliente do LLM e capa do
+        # documento) já está carregado, e o token vale só para esta execução, sem tocar no .env
+        atualizar(0.1, "Gerando o DIT...")
+        args = main.criar_parser().parse_args([
+            "--base-dir", str(job_dir),
+            "--cache-dir", str(CACHE_DIR),
+            "--yes",
+        ])
+        resumo = main.executar(
+            args,
+            api_key=token.strip(),
+            destino_progresso=lambda evento: atualizar(*descrever_evento(evento), evento=evento)
+        )
+        if resumo["status"] != "ok":
+            raise RuntimeError(f"Erro na execução: {resumo.get('erro', resumo['status'])}")
+        
+        dit_path = job_dir / "doc" / "DIT.docx"
+        if not dit_path.exists():
+            raise RuntimeError("DIT.docx não foi gerado.")
+
+        # Mantém só o DIT para download; o restante da pasta do job é descartado
+        for pasta in ["notebooks", "markdown", "log"]:
+            shutil.rmtree(job_dir / pasta, ignore_errors=True)
+        return str(dit_path)
+    except Exception:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+# Cada execução do pipeline tem estado próprio (main.Execucao): DIT_WORKERS_JOBS jobs rodam ao mesmo tempo,
+# dividindo o cliente do LLM (e seus limites de taxa) quando usam a mesma chave;
+# jobs excedentes aguardam na fila com a posição visível na interface. Criada em criar_interface
+FILA = None
+
+def submeter_job(token: str, diretorio: str):
+    # Valida e enfileira; a resposta volta na hora com o id do job
+    if not token.strip():
+        return "", "Erro: Token não pode estar vazio.", None
+    try:
+        listar_notebooks(diretorio)
+    except ValueError as e:
+        return "", f"Erro: {e}", None
+    job_id = FILA.submeter(token=token, diretorio=diretorio)
+    return job_id, f"Job {job_id} enfileirado.", None
+
+def consultar_status(job_id: str):
+    # Endpoint de consulta (também exposto na API como /status): retorna (status, arquivo)
+    import gradio as gr
+
+    if not job_id:
+        return gr.update(), gr.update()
+    job = FILA.status(job_id.strip())
+    if job is None:
+        return f"Job {job_id} não encontrado.", None
+    if job["status"] == STATUS_NA_FILA:
+        return f"Job {job_id}: aguardando na fila (posição {job.get('posicao_fila', '?')}).", None
+    if job["status"] == STATUS_EXECUTANDO:
+        decorrido = time.time() - job["iniciado_em"]
+        texto = f"Job {job_id}: {job['progresso']:.0%} ({decorrido:.0f}s)\n{job['mensagem']}"
+        evento = job["evento"]
+        if evento and evento.get("decorrido"):
+            # Vazão medida pelo próprio pipeline
+            texto += f"\nTokens: {evento['tokens']} ({evento['tokens'] / evento['decorrido']:.0f}/s)"
+            if evento["etapa"] == "resumo":
+                texto += f" | Células: {evento['concluidas'] / evento['decorrido']:.1f}/s"
+        return texto, None
+    if job["status"] == STATUS_ERRO:
+        return f"Job {job_id}: {job['mensagem']}", None
+    duracao = job["finalizado_em"] - job["iniciado_em"]
+    return f"Sucesso! Job {job_id} concluído em {duracao:.0f}s.", job["resultado"]
+
+def acompanhar_job(job_id: str):
+    # Gerador: o Gradio envia cada atualização ao navegador assim que ela acontece
+    while job_id:
+        status_texto, arquivo = consultar_status(job_id)
+        yield status_texto, arquivo
+        job = FILA.status(job_id.strip())
+        if job is None or job["status"] not in (STATUS_NA_FILA, STATUS_EXECUTANDO):
+            return
+        time.sleep(INTERVALO_STATUS)
+
 def limpar():
-    return "", "", None, ""
-
-# Interface com Gradio
-with gr.Blocks() as interface:
-    with gr.Row():
-        with gr.Column(scale=1):
-            token_input = gr.Textbox(label="Token GPT", placeholder="Insira o token aqui")
-            diretorio_input = gr.Textbox(label="Caminho Local dos Documentos", placeholder="Ex: C:/meus_docs")
-            with gr.Row():
-                limpar_btn = gr.Button("Limpar")
-                submeter_btn = gr.Button("Submeter")
-
-        with gr.Column(scale=1):
-            comentario_output = gr.Textbox(label="Comentário de Sucesso", interactive=False)
-            arquivo_saida = gr.File(label="Arquivo DIT (JSON)", interactive=False)
-
-    # Lógica dos botões
-    submeter_btn.click(fn=gerar_dit,
-                       inputs=[token_input, diretorio_input],
-                       outputs=[comentario_output, arquivo_saida])
-
-    limpar_btn.click(fn=limpar,
-                     inputs=[],
-                     outputs=[token_input, diretorio_input, arquivo_saida, comentario_output])
+    return "", "", None, "", ""
+
+def criar_interface():
+    global FILA
+    import gradio as gr
+
+    FILA = FilaJobs(executar_job, num_workers=int(os.getenv("DIT_WORKERS_JOBS", "2")))
+
+    with gr.Blocks(title="Conversor de Notebooks para DIT") as interface:
+    
+        # Botão para criar token (canto superior direito)
+        gr.HTML("""
+        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+            <h2 style="margin: 0;">Conversor de Notebooks Jupyter para Documento Técnico (DIT)</h2>
+            <a href='https://platform.openai.com/settings/organization/admin-keys' target='_blank'>
+                <button class='gr-button gr-button-lg gr-button-primary'
+                    style='background-color: #4CAF50; color: white; padding: 10px 20px; border-radius: 8px; border: none; cursor: pointer;'>
+                    Criar Token OpenAI
+                </button>
+            </a>
+        </div>
+        <p>Esta ferramenta converte notebooks Jupyter (.ipynb) em um Documento de Implementação Técnica formatado (.docx)</p>
+        """)
+    
+        with gr.Row():
+            with gr.Column():
+                token_input = gr.Textbox(
+                    label="Token OpenAI",
+                    placeholder="Insira seu token da API OpenAI aqui...",
+                    type="password"
+                )
+            
+                with gr.Row():
+                    diretorio_input = gr.Textbox(
+                        label="Diretório dos Notebooks",
+                        placeholder="Caminho para a pasta com os arquivos .ipynb"
+                    )
+                    diretorio_btn_source = gr.Button("📁 Procurar")
+            
+                with gr.Row():
+                    limpar_btn = gr.Button("🔄 Limpar")
+                    processar_btn = gr.Button("⚙️ Processar", variant="primary")
+        
+            with gr.Column():
+                with gr.Row():
+                    job_id_output = gr.Textbox(label="ID do Job")
+                    consultar_btn = gr.Button("🔍 Consultar")
+                status_output = gr.Textbox(label="Status", lines=3)
+                arquivo_output = gr.File(label="Documento Gerado")
+
+        diretorio_btn_source.click(selecionar_diretorio, outputs=diretorio_input)
+        # Depois de enfileirar, o progresso do job é transmitido ao navegador até o download ficar disponível
+        processar_btn.click(
+            submeter_job,
+            inputs=[token_input, diretorio_input],
+            outputs=[job_id_output, status_output, arquivo_output],
+            api_name="submeter"
+        ).then(
+            acompanhar_job,
+            inputs=job_id_output,
+            outputs=[status_output, arquivo_output],
+            api_name="acompanhar"
+        )
+        # Consulta pontual (ex.: job enviado pela API ou página recarregada)
+        consultar_btn.click(
+            consultar_status,
+            inputs=job_id_output,
+            outputs=[status_output, arquivo_output],
+            api_name="status"
+        )
+        limpar_btn.click(
+            limpar,
+            outputs=[token_input, diretorio_input, arquivo_output, status_output, job_id_output]
+        )
+    return interface
 
 if __name__ == "__main__":
-    interface.launch()
\ No newline at end of file
+    criar_interface().launch(server_port=7860)
\ No newline at end of file
@@ -1,120 +1,928 @@
-import gradio as gr
-import os
-import shutil
-from pathlib import Path
-from dotenv import load_dotenv, set_key
-import tkinter as tk
-from tkinter import filedialog
 import subprocess
 import sys
+import os
+import argparse
+import hashlib
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from pathlib import Path
+import logging
+from dotenv import load_dotenv
+
+# python-docx e langchain_openai são importados só nas etapas que os usam (montagem do documento e
+# chamadas ao LLM): conversão, resposta "n" ao DIT e --import-profile não pagam por eles.
+# Medição: python main.py --import-profile
+
+# Carrega variáveis do .env (antes das constantes abaixo, que podem vir dele)
+#---------------------------------------------------------------------------------------------------------------------------------
+load_dotenv()
+
+# Inicializa LLM com chave
+#---------------------------------------------------------------------------------------------------------------------------------
+# OPENAI_BASE_URL permite apontar para um servidor compatível (ex.: functions/servidor_llm_local.py)
+MODELO = "gpt-3.5-turbo-0125" # ou "gpt-4" se preferir
+TEMPERATURA = 0
+
+# Clientes já criados, por (modelo, hash da chave, base_url): em um processo de longa duração (interface)
+# os jobs seguintes reaproveitam o cliente e suas conexões HTTP. Ficam guardados no máximo MAX_CLIENTES_LLM
+# clientes; um cliente sem execução em andamento há mais de TTL_CLIENTE_LLM segundos é fechado
+MAX_CLIENTES_LLM = int(os.getenv("DIT_MAX_CLIENTES_LLM", "4"))
+TTL_CLIENTE_LLM = float(os.getenv("DIT_TTL_CLIENTE_LLM", "1800"))
+_clientes_llm = OrderedDict()  # {chave: {"cliente", "execucoes", "usado_em"}}, do menos ao mais recente
+_lock_clientes_llm = threading.Lock()
+
+def obter_cliente_llm(modelo, api_key=None):
+    # Cliente do LLM de uma execução; a chave pode chegar só na execução (ex.: token informado na interface).
+    # Devolvido com liberar_cliente_llm ao fim da execução
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = os.getenv("OPENAI_BASE_URL") or None
+    # O índice guarda só o hash da chave da API
+    chave = (modelo, hashlib.sha256((api_key or "").encode("utf-8")).hexdigest(), base_url)
+    with _lock_clientes_llm:
+        entrada = _clientes_llm.get(chave)
+        if entrada is None:
+            entrada = _clientes_llm[chave] = {"cliente": _criar_cliente_llm(modelo, api_key, base_url), "execucoes": 0}
+        _clientes_llm.move_to_end(chave)
+        entrada["execucoes"] += 1
+        entrada["usado_em"] = time.monotonic()
+        _descartar_clientes_llm()
+    return entrada["cliente"]
+
+def liberar_cliente_llm(cliente):
+    with _lock_clientes_llm:
+        for entrada in _clientes_llm.values():
+            if entrada["cliente"] is cliente:
+                entrada["execucoes"] -= 1
+                entrada["usado_em"] = time.monotonic()
+        _descartar_clientes_llm()
+
+def _descartar_clientes_llm():
+    # Fecha, do menos ao mais recente, os clientes parados que passam do limite ou do tempo sem uso;
+    # um cliente com execução em andamento nunca é fechado
+    agora = time.monotonic()
+    excedentes = len(_clientes_llm) - MAX_CLIENTES_LLM
+    for chave, entrada in list(_clientes_llm.items()):
+        if entrada["execucoes"] > 0:
+            continue
+        if excedentes > 0 or agora - entrada["usado_em"] > TTL_CLIENTE_LLM:
+            del _clientes_llm[chave]
+            entrada["cliente"].fechar()
+            excedentes -= 1
+
+def _criar_cliente_llm(modelo, api_key, base_url):
+    from langchain_openai import ChatOpenAI
+    from functions.limite_taxa import ClienteLLMResiliente
+
+    # Limites, retentativas e disjuntor ficam no cliente: valem para todas as execuções com a mesma chave
+    return ClienteLLMResiliente(
+        lambda http_client: ChatOpenAI(
+            model=modelo,
+            temperature=TEMPERATURA,
+            openai_api_key=api_key,
+            openai_api_base=base_url,
+            max_retries=0,
+            http_client=http_client
+        ),
+        modelo,
+        rpm=LIMITE_RPM,
+        tpm=LIMITE_TPM,
+        max_tentativas=MAX_TENTATIVAS_LLM
+    )
+
+# Limites da conta na OpenAI em requisições e tokens por minuto; 0 = aprendidos pelos cabeçalhos x-ratelimit-*
+# das respostas. Chamadas recusadas por limite (429) ou indisponibilidade são repetidas com backoff até
+# MAX_TENTATIVAS_LLM vezes (functions/limite_taxa.py)
+LIMITE_RPM = int(os.getenv("DIT_LIMITE_RPM", "0"))
+LIMITE_TPM = int(os.getenv("DIT_LIMITE_TPM", "0"))
+MAX_TENTATIVAS_LLM = int(os.getenv("DIT_MAX_TENTATIVAS_LLM", "6"))
+
+# Número máximo de chamadas simultâneas ao LLM por execução (resumos, partes de células divididas, sumário e introdução)
+MAX_CONCORRENCIA = int(os.getenv("DIT_MAX_CONCORRENCIA", "8"))
+
+# Empacotamento de blocos pequenos (ex.: atribuições, print, %run) em uma única chamada ao LLM
+EMPACOTAR_RESUMOS = os.getenv("DIT_EMPACOTAR_RESUMOS", "1") == "1"
+BLOCO_PEQUENO_TOKENS = int(os.getenv("DIT_BLOCO_PEQUENO_TOKENS", "200"))
+LOTE_MAX_TOKENS = int(os.getenv("DIT_LOTE_MAX_TOKENS", "3000"))
+
+# Células maiores que este limite são divididas e resumidas em map-reduce
+MAX_TOKENS_BLOCO = int(os.getenv("DIT_MAX_TOKENS_BLOCO", "6000"))
+
+# O documento é montado direto do JSON dos notebooks; o markdown em markdown/ passa a ser opcional
+GERAR_MARKDOWN = os.getenv("DIT_GERAR_MARKDOWN", "0") == "1"
+
+# Sumário: montado localmente a partir do nome dos arquivos (functions/sumario_local.py); o LLM só é
+# usado se DIT_SUMARIO_LLM=1. Com DIT_SUMARIO_CAMPO=1 o sumário é um campo TOC do Word ligado aos títulos
+SUMARIO_LLM = os.getenv("DIT_SUMARIO_LLM", "0") == "1"
+SUMARIO_CAMPO = os.getenv("DIT_SUMARIO_CAMPO", "0") == "1"
 
-def selecionar_diretorio():
-    root = tk.Tk()
-    root.withdraw()
-    root.wm_attributes('-topmost', 1)
-    diretorio = filedialog.askdirectory(title="Selecione a pasta com os notebooks")
-    return diretorio if diretorio else ""
+# Blocos de código repetidos entre notebooks (boilerplate de configuração, widgets, %run) são resumidos
+# uma vez por execução (functions/deduplicacao.py). Com DIT_DEDUP_SIMILARIDADE entre 0 e 1, blocos quase
+# iguais (similaridade de Jaccard estimada por MinHash) também reaproveitam o resumo; 0 = só blocos iguais
+DEDUP_CODIGO = os.getenv("DIT_DEDUP_CODIGO", "1") == "1"
+DEDUP_SIMILARIDADE = float(os.getenv("DIT_DEDUP_SIMILARIDADE", "0"))
 
-def processar_notebooks(token: str, diretorio: str):
+# Escrita do .docx seção por seção direto no arquivo (memória limitada pela maior seção)
+DOCX_STREAMING = os.getenv("DIT_DOCX_STREAMING", "0") == "1"
+
+# Processos que montam as seções dos notebooks enquanto os resumos dos demais ainda são gerados
+# (padrão: número de CPUs; 1 = seções montadas no processo principal)
+WORKERS_SECOES = int(os.getenv("DIT_WORKERS_SECOES", "0")) or os.cpu_count()
+
+# Processos usados na conversão dos notebooks (padrão: número de CPUs; 1 = conversão serial)
+WORKERS_CONVERSAO = int(os.getenv("DIT_WORKERS_CONVERSAO", "0")) or os.cpu_count()
+
+# Cache persistente das respostas do LLM (inicializado em main)
+# Incrementar a versão de um prompt invalida as respostas salvas com o texto antigo
+#---------------------------------------------------------------------------------------------------------------------------------
+VERSAO_PROMPT_SUMARIO = "1"
+VERSAO_PROMPT_INTRODUCAO = "1"
+VERSAO_PROMPT_RESUMO = "2"
+VERSAO_PROMPT_PARTE = "1"
+VERSAO_PROMPT_REDUCAO = "1"
+CACHE_MAX_MB = int(os.getenv("DIT_CACHE_MAX_MB", "200"))
+
+# Caminhos
+#---------------------------------------------------------------------------------------------------------------------------------
+output_path = Path("./doc/DIT.docx")
+modelo_path = Path(__file__).resolve().parent / "doc" / "DIT_model.docx"  # estilos, cabeçalho e rodapé do DIT
+
+# Estado de uma execução
+#---------------------------------------------------------------------------------------------------------------------------------
+# Opções, cliente do LLM, cache, progresso e log de uma execução do pipeline, passados às funções abaixo em vez
+# de ficarem no módulo: a interface gera vários DITs ao mesmo tempo no mesmo processo.
+# Os padrões vêm das variáveis de ambiente (constantes acima)
+class Execucao:
+    def __init__(self, llm=None, modelo=MODELO, cache_llm=None, progresso=None, logger=None,
+                 max_concorrencia=MAX_CONCORRENCIA, docx_streaming=DOCX_STREAMING, sumario_llm=SUMARIO_LLM,
+                 sumario_campo=SUMARIO_CAMPO, dedup_codigo=DEDUP_CODIGO, dedup_similaridade=DEDUP_SIMILARIDADE):
+        from functions.progresso import EmissorProgresso
+
+        self.llm = llm
+        self.modelo = modelo
+        self.cache_llm = cache_llm  # None = sem cache
+        # Eventos de progresso (etapa, notebook, célula, tokens, tempo); sem destino só soma os tokens
+        self.progresso = progresso or EmissorProgresso()
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_concorrencia = max(1, max_concorrencia)
+        # Limite único de chamadas ao LLM em andamento na execução: vale para os resumos, as partes de células
+        # divididas (pool próprio dentro de um resumo) e o sumário/introdução antecipados
+        self.limite_llm = threading.BoundedSemaphore(self.max_concorrencia)
+        self.docx_streaming = docx_streaming
+        self.sumario_llm = sumario_llm
+        self.sumario_campo = sumario_campo
+        self.dedup_codigo = dedup_codigo
+        self.dedup_similaridade = dedup_similaridade
+
+# Funções auxiliares
+#---------------------------------------------------------------------------------------------------------------------------------
+@contextmanager
+def medir_etapa(tempos, etapa):
+    # Registra em tempos[etapa] a duração (s) do bloco, para o resumo JSON da execução
+    inicio = time.perf_counter()
     try:
-        # Configuração inicial
-        env_path = Path(".env")
-        env_path.write_text(f"OPENAI_API_KEY={token}\n", encoding="utf-8")
-        load_dotenv()
-        
-        # Verificações de diretório
-        if not os.path.isdir(diretorio):
-            return "Erro: Diretório inválido ou inexistente.", None
-        
-        arquivos = [f for f in os.listdir(diretorio) if f.endswith(".ipynb")]
-        if not arquivos:
-            return "Erro: Nenhum arquivo .ipynb encontrado.", None
-        
-        # Preparação do ambiente
-        pastas = ["notebooks", "markdown", "doc"]
-        for pasta in pastas:
-            shutil.rmtree(pasta, ignore_errors=True)
-            os.makedirs(pasta, exist_ok=True)
-        
-        # Cópia dos notebooks
-        for arquivo in arquivos:
-            shutil.copy2(
-                os.path.join(diretorio, arquivo),
-                os.path.join("notebooks", arquivo)
-            )
-        
-        # Execução do processo principal
-        result = subprocess.run(
-            [sys.executable, "main.py"],
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
-            return f"Erro na execução: {result.stderr}", None
-        
-        dit_path = os.path.join("doc", "DIT.docx")
-        if os.path.exists(dit_path):
-            return f"Sucesso! {len(arquivos)} notebooks processados.", dit_path
+        yield
+    finally:
+        if tempos is not None:
+            tempos[etapa] = round(tempos.get(etapa, 0) + time.perf_counter() - inicio, 3)
+
+#---------------------------------------------------------------------------------------------------------------------------------
+# Pool de processos que monta as seções: criado na primeira execução que precisa dele e reaproveitado pelas
+# seguintes, inclusive as simultâneas da interface. Cada processo do spawn reimporta o __main__ de quem chamou
+# (main.py ou interface.py), o que assim acontece uma vez por processo, e não a cada DIT
+_pool_secoes = None
+_lock_pool_secoes = threading.Lock()
+
+def obter_pool_secoes():
+    global _pool_secoes
+    with _lock_pool_secoes:
+        if _pool_secoes is None:
+            import multiprocessing
+            # spawn: o processo principal já tem threads com chamadas HTTP em andamento, e um fork copiaria locks presos
+            _pool_secoes = ProcessPoolExecutor(max_workers=WORKERS_SECOES, mp_context=multiprocessing.get_context("spawn"))
+        return _pool_secoes
+
+def descartar_pool_secoes(pool):
+    # Um processo do pool terminou de forma anormal (BrokenProcessPool): a próxima execução cria outro pool
+    global _pool_secoes
+    with _lock_pool_secoes:
+        if _pool_secoes is pool:
+            _pool_secoes = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def chamar_llm(ex, prompt):
+    from functions.progresso import tokens_da_resposta
+    with ex.limite_llm:
+        resposta = ex.llm.invoke(prompt)
+    ex.progresso.somar_tokens(tokens_da_resposta(resposta))
+    return resposta.content.strip()
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def chave_cache(ex, tipo, versao, *partes_chave):
+    if ex.cache_llm is None:
+        return None
+    return ex.cache_llm.chave(ex.modelo, TEMPERATURA, tipo, versao, *partes_chave)
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def invocar_llm(ex, prompt, tipo, versao, *partes_chave):
+    # Sem cache configurado, chama o LLM diretamente
+    chave = chave_cache(ex, tipo, versao, *partes_chave)
+    if chave is None:
+        return chamar_llm(ex, prompt)
+    return ex.cache_llm.obter_ou_gerar(chave, lambda: chamar_llm(ex, prompt))
+
+#---------------------------------------------------------------------------------------------------------------------------------
+from pathlib import Path
+
+def gerar_sumario(ex, md_files_list):
+    if not ex.sumario_llm:
+        from functions.sumario_local import gerar_sumario_local
+        return gerar_sumario_local(md_files_list)
+
+    md_nomes_formatados = "\n".join(
+        Path(md).stem.replace("_", " ").title() for md in md_files_list
+    )
+
+    prompt = f"""
+Você é um assistente técnico responsável por montar sumários técnicos.
+
+Seu objetivo é gerar um **sumário estruturado** em formato de lista, baseado nos nomes dos arquivos Markdown fornecidos.
+
+Caso os nomes dos arquivos não estejam em um formato adequado, você deve criar títulos apropriados, retirando números no início e ajustando capitalização.
+
+Regras:
+- Não repita o título "Sumário".
+- Não repita o número duas vezes.
+- Não inclua conteúdo extra nem explicações.
+- Cada título deve estar em uma nova linha.
+- Numerar os itens sequencialmente.
+
+Aqui estão os nomes dos arquivos:
+{md_nomes_formatados}
+
+Gere apenas o sumário numerado nesse formato.
+"""
+    return invocar_llm(ex, prompt, "sumario", VERSAO_PROMPT_SUMARIO, md_nomes_formatados)
+
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def gerar_introducao(ex, md_files_list):
+    # Transformar a lista em uma lista formatada para leitura
+    arquivos_formatados = '\n'.join([f"- {nome}" for nome in md_files_list])
+
+    prompt = f"""
+Você é um assistente técnico especializado na elaboração de Documentos de Implementação Técnica (DIT). Seu objetivo é redigir a **introdução** do documento com base na lista de notebooks utilizados no projeto:
+
+{arquivos_formatados}
+
+### Regras de estilo:
+
+- Linguagem: técnica, objetiva, institucional e clara.
+- Título e subtítulos: já definidos; **NÃO os gere novamente**.
+- Fonte do corpo do texto: "Arial Nova" (ou similar), tamanho 11, cor preta.
+- Scripts Python: destaque com formatação de código, fonte "Arial Nova", tamanho 9, cor levemente acinzentada, espaçamento 1,15.
+- Parágrafos: espaçamento entre linhas de 1,15, justificados.
+
+### Objetivo:
+
+Crie uma **introdução técnica padronizada**, que explique brevemente:
+- O escopo geral do projeto.
+- O objetivo do documento.
+- O papel dos notebooks listados (por exemplo, se realizam ingestão, tratamento, análise ou visualização de dados).
+- O valor ou impacto que esse documento oferece à equipe técnica ou ao negócio.
+
+Evite repetições, **não escreva o título novamente**, e utilize linguagem clara, técnica e concisa.
+"""
+    return invocar_llm(ex, prompt, "introducao", VERSAO_PROMPT_INTRODUCAO, arquivos_formatados)
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def montar_prompt_resumo(titulo, codigo, index, ordem_execucao=None):
+    from functions.leitor_notebook import descrever_ordem_execucao
+    return f"""
+Você é um assistente técnico responsável por gerar conteúdo para um Documento de Implementação Técnica (DIT), no padrão institucional da Minerva Foods.
+
+Seu objetivo é produzir um parágrafo de resumo técnico para um trecho de código Python, seguindo a estrutura e estilo de documentação formal do modelo DIT.
+
+### Instruções de formatação e estilo:
+
+- O conteúdo faz parte da seção "{index}. {titulo}" do documento.
+{descrever_ordem_execucao(ordem_execucao)}- Use linguagem **técnica**, **objetiva**, **profissional** e em **tom institucional**.
+- O parágrafo deve ter:
+  - Fonte: Arial Nova (ou similar), tamanho 11
+  - Cor: preta
+  - Espaçamento entre linhas: 1,15
+- Os títulos e subtítulos do documento serão formatados com coloração azul tecnológica: #2D5BFF.
+- O bloco de código será inserido com:
+  - Fonte: Arial Nova (ou similar), tamanho 9
+  - Cor levemente mais clara (cinza escuro)
+  - Espaçamento entre linhas de 1,15
+- Não repita o código, apenas gere o resumo.
+
+### Trecho de código do notebook "{titulo}":
+
+{codigo}
+
+Com base nisso, escreva **apenas o parágrafo explicativo** sobre a lógica e propósito do código. Não inclua o código novamente.
+"""
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def gerar_resumo_por_arquivo(ex, titulo, codigo, index, ordem_execucao=None):
+    from functions.empacotamento import contar_tokens
+
+    # Células que não cabem na janela de contexto são resumidas por partes
+    if contar_tokens(codigo, ex.modelo) > MAX_TOKENS_BLOCO:
+        chave = chave_cache(ex, "resumo", VERSAO_PROMPT_RESUMO, titulo, codigo)
+        if chave is None:
+            return resumir_em_partes(ex, titulo, codigo, index)
+        return ex.cache_llm.obter_ou_gerar(chave, lambda: resumir_em_partes(ex, titulo, codigo, index))
+
+    prompt = montar_prompt_resumo(titulo, codigo, index, ordem_execucao)
+    # O índice da seção e a ordem de execução ficam fora da chave: incluir/remover um notebook ou reexecutá-lo
+    # (o que muda todos os execution_count) não invalida os resumos
+    return invocar_llm(ex, prompt, "resumo", VERSAO_PROMPT_RESUMO, titulo, codigo)
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def montar_prompt_parte(titulo, parte, index, numero, total):
+    return f"""
+Você é um assistente técnico responsável por gerar conteúdo para um Documento de Implementação Técnica (DIT), no padrão institucional da Minerva Foods.
+
+O trecho abaixo é a parte {numero} de {total} de uma única célula de código da seção "{index}. {titulo}", dividida por ser muito extensa.
+
+Descreva de forma **técnica** e **objetiva**, em um parágrafo curto, o que esta parte faz (tabelas, colunas, regras e operações envolvidas). Não repita o código.
+
+### Parte {numero} de {total}:
+
+{parte}
+"""
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def montar_prompt_reducao(titulo, index, parciais):
+    resumos_formatados = "\n\n".join(f"- {resumo}" for resumo in parciais)
+    return f"""
+Você é um assistente técnico responsável por gerar conteúdo para um Documento de Implementação Técnica (DIT), no padrão institucional da Minerva Foods.
+
+Os itens abaixo descrevem, em ordem, partes consecutivas de uma mesma célula de código da seção "{index}. {titulo}".
+
+Combine-os em **um único parágrafo** de resumo técnico, em linguagem **técnica**, **objetiva**, **profissional** e em **tom institucional**, explicando a lógica e o propósito do código como um todo. Não mencione a divisão em partes.
+
+### Resumos das partes:
+
+{resumos_formatados}
+"""
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def resumir_em_partes(ex, titulo, codigo, index):
+    # Map: resume as partes em paralelo; reduce: junta os resumos parciais em um parágrafo
+    from functions.divisao_codigo import dividir_codigo
+    from functions.empacotamento import contar_tokens
+    from functions.resumo_concorrente import gerar_resumos_concorrentes
+
+    partes = list(dividir_codigo(codigo, ex.modelo, MAX_TOKENS_BLOCO))
+    ex.logger.info(f"[⚙️] Seção {index}: célula dividida em {len(partes)} parte(s) para o resumo.")
+
+    def resumir_parte(parte, numero):
+        prompt = montar_prompt_parte(titulo, parte, index, numero, len(partes))
+        return invocar_llm(ex, prompt, "resumo_parte", VERSAO_PROMPT_PARTE, titulo, parte)
+
+    tarefas = [(numero, (parte, numero)) for numero, parte in enumerate(partes, start=1)]
+    resultados = gerar_resumos_concorrentes(tarefas, resumir_parte, ex.max_concorrencia, ex.logger)
+    parciais = [resultados[numero] for numero in range(1, len(partes) + 1)]
+
+    # Se os resumos parciais somados ainda não couberem em um prompt, reduz em níveis
+    while len(parciais) > 1 and contar_tokens("\n\n".join(parciais), ex.modelo) > MAX_TOKENS_BLOCO:
+        grupos, grupo, tokens_grupo = [], [], 0
+        for resumo in parciais:
+            tokens = contar_tokens(resumo, ex.modelo)
+            if len(grupo) > 1 and tokens_grupo + tokens > MAX_TOKENS_BLOCO:
+                grupos.append(grupo)
+                grupo, tokens_grupo = [], 0
+            grupo.append(resumo)
+            tokens_grupo += tokens
+        grupos.append(grupo)
+        parciais = [
+            invocar_llm(ex, montar_prompt_reducao(titulo, index, g), "resumo_reducao", VERSAO_PROMPT_REDUCAO, titulo, *g)
+            for g in grupos
+        ]
+
+    if len(parciais) == 1:
+        return parciais[0]
+    prompt = montar_prompt_reducao(titulo, index, parciais)
+    return invocar_llm(ex, prompt, "resumo_reducao", VERSAO_PROMPT_REDUCAO, titulo, *parciais)
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def gerar_resumos_lote(ex, titulo, lote, ordens=None):
+    # lote: [((idx, i), codigo)] de um mesmo notebook; retorna {(idx, i): resumo}
+    # ordens: {(idx, i): ordem de execução da célula}, usada nos prompts
+    # Cada resumo é salvo no cache com a mesma chave do modo individual
+    ordens = ordens or {}
+    from functions.empacotamento import montar_prompt_lote, separar_resposta_lote
+
+    if len(lote) == 1:
+        (idx, i), codigo = lote[0]
+        return {(idx, i): gerar_resumo_por_arquivo(ex, titulo, codigo, f"{idx}.{i}", ordens.get((idx, i)))}
+
+    resultados, pendentes = {}, []
+    for chave, codigo in lote:
+        chave_resumo = chave_cache(ex, "resumo", VERSAO_PROMPT_RESUMO, titulo, codigo)
+        salvo = ex.cache_llm.obter(chave_resumo) if chave_resumo else None
+        if salvo is not None:
+            resultados[chave] = salvo
         else:
-            return "Erro: DIT.docx não foi gerado.", None
-            
-    except Exception as e:
-        return f"Erro crítico: {str(e)}", None
+            pendentes.append((chave, codigo))
 
-def limpar():
-    return "", "", None, ""
+    separados = {}
+    if len(pendentes) > 1:
+        separados = separar_resposta_lote(chamar_llm(ex, montar_prompt_lote(titulo, pendentes, ordens)), pendentes)
 
-with gr.Blocks(title="Conversor de Notebooks para DIT") as interface:
-    
-    # Botão para criar token (canto superior direito)
-    gr.HTML("""
-    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
-        <h2 style="margin: 0;">Conversor de Notebooks Jupyter para Documento Técnico (DIT)</h2>
-        <a href='https://platform.openai.com/settings/organization/admin-keys' target='_blank'>
-            <button class='gr-button gr-button-lg gr-button-primary'
-                style='background-color: #4CAF50; color: white; padding: 10px 20px; border-radius: 8px; border: none; cursor: pointer;'>
-                Criar Token OpenAI
-            </button>
-        </a>
-    </div>
-    <p>Esta ferramenta converte notebooks Jupyter (.ipynb) em um Documento de Implementação Técnica formatado (.docx)</p>
-    """)
+    for chave, codigo in pendentes:
+        resumo = separados.get(chave)
+        if resumo is None:
+            # Seção ausente na resposta do lote (ou lote de um só bloco): gera individualmente
+            idx, i = chave
+            resumo = chamar_llm(ex, montar_prompt_resumo(titulo, codigo, f"{idx}.{i}", ordens.get(chave)))
+        resultados[chave] = resumo
+        if ex.cache_llm is not None:
+            ex.cache_llm.gravar(chave_cache(ex, "resumo", VERSAO_PROMPT_RESUMO, titulo, codigo), resumo)
+    return resultados
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def carregar_conteudo(arquivo):
+    # Retorna (texto, celulas) de um .ipynb (leitura direta das células) ou de um .md já convertido;
+    # celulas: células de código (functions/leitor_notebook.Celula), sem ordem de execução no caso do .md
+    from functions.leitor_notebook import Celula, extrair_conteudo_notebook
+    if arquivo.suffix == ".ipynb":
+        return extrair_conteudo_notebook(arquivo)
+
+    from functions.segmentador_markdown import extrair_conteudo_markdown
+    with open(arquivo, "r", encoding="utf-8") as f:
+        texto, codigos = extrair_conteudo_markdown(f.read())
+    return texto, [Celula("code", codigo, None, posicao) for posicao, codigo in enumerate(codigos)]
+
+#---------------------------------------------------------------------------------------------------------------------------------
+@lru_cache(maxsize=2)
+def modelo_documento(atualizar_campos=False):
+    # Capa e objetivo do documento, iguais em todo DIT: montados uma vez por processo e
+    # guardados como bytes; cada documento novo parte de uma cópia
+    # atualizar_campos: o Word atualiza o sumário (campo TOC) ao abrir o arquivo
+    from docx.shared import Pt
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from functions.modelo_dit import novo_documento, ativar_atualizacao_campos, ESTILO_TITULO, ESTILO_CORPO
+
+    doc = novo_documento(modelo_path)
+    if atualizar_campos:
+        ativar_atualizacao_campos(doc)
+
+    # CAPA
+    # Adiciona parágrafos vazios para empurrar o conteúdo para baixo (~30%)
+    for _ in range(10):  # ajuste esse número conforme necessário
+        doc.add_paragraph()
     
-    with gr.Row():
-        with gr.Column():
-            token_input = gr.Textbox(
-                label="Token OpenAI",
-                placeholder="Insira seu token da API OpenAI aqui...",
-                type="password"
-            )
-            
-            with gr.Row():
-                diretorio_input = gr.Textbox(
-                    label="Diretório dos Notebooks",
-                    placeholder="Caminho para a pasta com os arquivos .ipynb"
-                )
-                diretorio_btn_source = gr.Button("📁 Procurar")
-            
-            with gr.Row():
-                limpar_btn = gr.Button("🔄 Limpar")
-                processar_btn = gr.Button("⚙️ Processar", variant="primary")
-        
-        with gr.Column():
-            status_output = gr.Textbox(label="Status")
-            arquivo_output = gr.File(label="Documento Gerado")
-
-    diretorio_btn_source.click(selecionar_diretorio, outputs=diretorio_input)
-    processar_btn.click(
-        processar_notebooks,
-        inputs=[token_input, diretorio_input],
-        outputs=[status_output, arquivo_output]
+    # CAPA
+    # Fonte, cor e negrito vêm do estilo "DIT Heading"; só o tamanho é próprio da capa
+    titulo = doc.add_paragraph(style=ESTILO_TITULO)
+    titulo.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    run = titulo.add_run("Dataside")
+    run.font.size = Pt(25)
+
+    # Subtítulo
+    subtitulo = doc.add_paragraph(style=ESTILO_CORPO)
+    subtitulo.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    run_sub = subtitulo.add_run("Documentação Técnica - Automação de Notebooks\n\nDocumento de Implementação Técnica")
+    run_sub.font.size = Pt(14)
+
+    doc.add_page_break()
+
+    # INTRODUÇÃO
+    doc.add_heading("Objetivo do documento", level=1)
+    doc.add_paragraph(
+        "Este Documento de Implementação Técnica (DIT) tem como objetivo registrar, de forma detalhada, padronizada e"
+        "profissional, as soluções técnicas desenvolvidas no escopo do projeto, com ênfase na automação e execução de scripts"
+        "contidos em notebooks."
+
+        "O documento visa garantir rastreabilidade, compreensão técnica, reprodutibilidade das implementações e alinhamento com as" 
+        "melhores práticas de desenvolvimento e documentação adotadas pela Dataside. Além disso, busca facilitar a comunicação"
+        "entre equipes técnicas e não técnicas, assegurando que o conhecimento gerado esteja devidamente estruturado e acessível" 
+        "para auditorias, manutenções futuras e expansão do projeto.",
+        style=ESTILO_CORPO
     )
-    limpar_btn.click(
-        limpar,
-        outputs=[token_input, diretorio_input, arquivo_output, status_output]
+
+    doc.add_page_break()
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+#---------------------------------------------------------------------------------------------------------------------------------
+# Geração do documento estruturado com base no modelo
+# arquivos: notebooks (.ipynb) ou markdowns (.md), na ordem em que entram no documento
+# Retorna o número de resumos gerados; as durações de cada etapa são somadas em tempos
+def criar_doc_com_conteudo(ex, arquivos, output_path=output_path, tempos=None):
+    from functions.escritor_docx import criar_escritor
+
+    # Documento a partir da capa já montada; em streaming cada seção vai direto para o arquivo
+    escritor = criar_escritor(modelo_documento(ex.sumario_campo), output_path, ex.docx_streaming)
+    try:
+        resumos = _escrever_documento(ex, escritor, arquivos, tempos)
+    except BaseException:
+        escritor.descartar()
+        raise
+    ex.progresso.emitir("documento", saida=str(output_path))
+    print(f"✅ Documento criado com sucesso: {output_path}")
+
+    if ex.cache_llm is not None:
+        ex.cache_llm.registrar_estatisticas(ex.logger)
+    return len(resumos)
+
+# Escreve sumário, introdução e as seções dos notebooks no escritor; retorna {(idx, i): resumo}
+def _escrever_documento(ex, escritor, arquivos, tempos):
+    from functions.modelo_dit import adicionar_campo_sumario, adicionar_texto
+    from functions.sumario_local import normalizar_titulo
+
+    md_files_list = [f.name for f in arquivos if f.is_file()]
+    ex.progresso.emitir("inicio", notebooks=len(arquivos))
+
+    # Lê todos os arquivos antes de chamar o LLM
+    secoes = []
+    ordens = {}  # {(idx, i): ordem de execução da célula}, só para os prompts
+    with medir_etapa(tempos, "leitura"):
+        for idx, arquivo in enumerate(arquivos, start=1):
+            # Mesmo título do sumário local, para o cabeçalho da seção coincidir com a entrada do sumário
+            titulo = normalizar_titulo(arquivo.name)
+            texto, celulas = carregar_conteudo(arquivo)
+            codigos = [celula.fonte for celula in celulas]
+            ordens.update(((idx, i), celula.ordem_execucao) for i, celula in enumerate(celulas, start=1))
+            secoes.append((idx, titulo, texto, codigos))
+            ex.progresso.emitir("leitura", notebook=arquivo.name, indice=idx, celulas=len(codigos))
+
+    # Dispara todos os resumos de uma vez, com concorrência limitada.
+    # Assim que um notebook tem todos os resumos, a seção dele é montada em um fragmento (em outro
+    # processo, se WORKERS_SECOES > 1) enquanto os demais ainda aguardam o LLM. Os fragmentos são gravados
+    # no escritor assim que todas as partes anteriores do documento foram gravadas, e descartados em seguida:
+    # em streaming, só ficam em memória as seções prontas que esperam uma anterior
+    from functions.escritor_docx import montar_fragmento
+    from functions.modelo_dit import adicionar_secao_notebook
+
+    total_celulas = sum(len(codigos) for _, _, _, codigos in secoes)
+
+    # Só o representante de cada grupo de blocos repetidos vai para o LLM; as cópias recebem o mesmo resumo
+    from functions.deduplicacao import IndiceDeduplicacao
+    indice = IndiceDeduplicacao(ex.dedup_similaridade)
+    if ex.dedup_codigo:
+        for idx, _, _, codigos in secoes:
+            for i, codigo in enumerate(codigos, start=1):
+                indice.adicionar((idx, i), codigo)
+        if indice.repetidos:
+            ex.logger.info(f"[=] {indice.repetidos} bloco(s) repetido(s) reaproveitam o resumo de outro bloco; {total_celulas - indice.repetidos} resumo(s) a gerar.")
+    copias = indice.copias
+    repetidos = {chave for chaves in copias.values() for chave in chaves}
+
+    nomes = {idx: arquivo.name for idx, arquivo in enumerate(arquivos, start=1)}
+    faltando = {idx: len(codigos) for idx, _, _, codigos in secoes}
+    concluidas = 0
+    resumos = {}
+    fragmentos = {}  # {idx: XML da seção, ou o futuro dele se montada em outro processo}, até ser gravado
+    proxima = 0  # próxima parte a gravar: 0 = sumário, 1 = introdução, 1 + idx = seção do notebook idx
+
+    def montar_secao(idx):
+        _, titulo, texto, codigos = secoes[idx - 1]
+        resumos_secao = {(idx, i): resumos[(idx, i)] for i in range(1, len(codigos) + 1)}
+        args = (escritor.rascunho, adicionar_secao_notebook, idx, titulo, texto, codigos, resumos_secao)
+        fragmentos[idx] = montador.submit(montar_fragmento, *args) if montador else montar_fragmento(*args)
+
+    def resumo_concluido(chave, resultado):
+        # Um evento por notebook a cada chamada concluída; em lote, resultado traz um resumo por célula,
+        # e as cópias de um bloco repetido podem estar em outros notebooks
+        nonlocal concluidas
+        novos = dict(resultado) if isinstance(resultado, dict) else {chave: resultado}
+        for celula, resumo in list(novos.items()):
+            novos.update((copia, resumo) for copia in copias.get(celula, ()))
+        resumos.update(novos)
+
+        por_notebook = {}
+        for idx, i in sorted(novos):
+            por_notebook.setdefault(idx, []).append(i)
+        for idx, celulas in por_notebook.items():
+            concluidas += len(celulas)
+            ex.progresso.emitir(
+                "resumo", notebook=nomes[idx], celulas=celulas,
+                concluidas=concluidas, total=total_celulas
+            )
+            faltando[idx] -= len(celulas)
+            if faltando[idx] == 0:
+                montar_secao(idx)
+        escrever_prontas()
+
+    def escrever_sumario():
+        sumario = futuro_sumario.result() if futuro_sumario else ""
+        with escritor.secao() as doc:
+            doc.add_heading("Sumário", level=1)
+            if ex.sumario_campo:
+                adicionar_campo_sumario(doc)
+            for linha in sumario.splitlines():
+                if linha.strip():  # evita adicionar linhas vazias
+                    doc.add_paragraph(linha, style='List Number')
+            doc.add_page_break()
+
+    def escrever_introducao():
+        introducao = futuro_introducao.result()
+        with escritor.secao() as doc:
+            doc.add_heading("Introdução", level=1)
+            adicionar_texto(doc, introducao)
+            doc.add_page_break()
+
+    def escrever_prontas(esperar=False):
+        # Grava, na ordem do documento, as partes que já estão prontas; esperar=True aguarda cada uma.
+        # Chamada a cada resumo concluído (na thread que monta o documento)
+        nonlocal proxima
+        while proxima < len(secoes) + 2:
+            if proxima < 2:
+                futuro = futuro_sumario if proxima == 0 else futuro_introducao
+                if futuro is not None and not esperar and not futuro.done():
+                    return
+                with medir_etapa(tempos, "documento"):
+                    if proxima == 0:
+                        escrever_sumario()
+                    else:
+                        escrever_introducao()
+            else:
+                idx = proxima - 1
+                fragmento = fragmentos.get(idx)
+                if fragmento is None or (montador and not esperar and not fragmento.done()):
+                    return
+                with medir_etapa(tempos, "documento"):
+                    escritor.escrever_fragmento(fragmento.result() if montador else fragmento)
+                del fragmentos[idx]
+            proxima += 1
+
+    # Sumário e introdução não dependem dos resumos: são disparados já no início, em paralelo com os
+    # resumos e a montagem das seções, e gravados assim que ficam prontos
+    def etapa_documento(etapa, funcao):
+        with medir_etapa(tempos, etapa):
+            resultado = funcao(ex, md_files_list)
+        ex.progresso.emitir(etapa)
+        return resultado
+
+    antecipadas = ThreadPoolExecutor(max_workers=2, thread_name_prefix="documento")
+    futuro_sumario = None if ex.sumario_campo else antecipadas.submit(etapa_documento, "sumario", gerar_sumario)
+    futuro_introducao = antecipadas.submit(etapa_documento, "introducao", gerar_introducao)
+
+    montador = obter_pool_secoes() if WORKERS_SECOES > 1 and len(secoes) > 1 else None
+    try:
+        for idx, _, _, codigos in secoes:
+            if not codigos:
+                montar_secao(idx)
+        escrever_prontas()
+
+        with medir_etapa(tempos, "resumos"):
+            from functions.resumo_concorrente import gerar_resumos_concorrentes
+            if EMPACOTAR_RESUMOS:
+                from functions.empacotamento import agrupar_blocos
+                tarefas = []
+                for idx, titulo, _, codigos in secoes:
+                    itens = [((idx, i), codigo) for i, codigo in enumerate(codigos, start=1) if (idx, i) not in repetidos]
+                    lotes = agrupar_blocos(itens, ex.modelo, BLOCO_PEQUENO_TOKENS, LOTE_MAX_TOKENS)
+                    tarefas.extend(((idx, n), (titulo, lote)) for n, lote in enumerate(lotes))
+                gerar_resumos_concorrentes(tarefas, partial(gerar_resumos_lote, ex, ordens=ordens), ex.max_concorrencia, ex.logger, resumo_concluido)
+            else:
+                tarefas = [
+                    ((idx, i), (titulo, codigo, f"{idx}.{i}", ordens[(idx, i)]))
+                    for idx, titulo, _, codigos in secoes
+                    for i, codigo in enumerate(codigos, start=1)
+                    if (idx, i) not in repetidos
+                ]
+                gerar_resumos_concorrentes(tarefas, partial(gerar_resumo_por_arquivo, ex), ex.max_concorrencia, ex.logger, resumo_concluido)
+
+        # Grava o que ainda falta (seções montadas em outro processo, introdução ainda em geração)
+        escrever_prontas(esperar=True)
+    except BrokenProcessPool:
+        descartar_pool_secoes(montador)
+        raise
+    finally:
+        antecipadas.shutdown(cancel_futures=True)
+        # O pool é compartilhado: cancela só as seções desta execução que ainda não começaram
+        if montador is not None:
+            for fragmento in fragmentos.values():
+                fragmento.cancel()
+
+    with medir_etapa(tempos, "documento"):
+        # Rodapé institucional (não é rodapé técnico)
+        with escritor.secao() as doc:
+            doc.add_paragraph(
+                "\n\nDocumento Interno - A divulgação sem autorização prévia viola as normas e diretrizes da organização.",
+                style="Normal"
+            )
+
+        escritor.salvar()
+    return resumos
+
+# Linha de comando
+#---------------------------------------------------------------------------------------------------------------------------------
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Gera o Documento de Implementação Técnica (DIT) a partir de notebooks.")
+    parser.add_argument("--base-dir", type=Path, help="Pasta de trabalho (log/, markdown/, doc/). Padrão: pasta do script")
+    parser.add_argument("--entrada", type=Path, help="Pasta com os notebooks .ipynb. Padrão: <base-dir>/notebooks")
+    parser.add_argument("--saida", type=Path, help="Caminho do DIT gerado. Padrão: <base-dir>/doc/DIT.docx")
+    parser.add_argument("--modelo", default=MODELO, help=f"Modelo da OpenAI (padrão: {MODELO})")
+    parser.add_argument("--concorrencia", type=int, default=MAX_CONCORRENCIA, help="Chamadas simultâneas ao LLM")
+    parser.add_argument("--cache-dir", type=Path, help="Pasta do cache de respostas. Padrão: DIT_CACHE_DIR ou <base-dir>/cache")
+    parser.add_argument("--sem-cache", action="store_true", help="Não usa o cache de respostas do LLM")
+    parser.add_argument("--sumario-llm", action="store_true", default=SUMARIO_LLM, help="Gera o sumário com o LLM em vez do normalizador local de títulos")
+    parser.add_argument("--sumario-campo", action="store_true", default=SUMARIO_CAMPO, help="Insere o sumário como campo TOC do Word, ligado aos estilos de título")
+    parser.add_argument("--sem-dedup", action="store_true", default=not DEDUP_CODIGO, help="Resume cada bloco de código mesmo quando ele se repete em outros notebooks")
+    parser.add_argument("--dedup-similaridade", type=float, default=DEDUP_SIMILARIDADE, help="Reaproveita o resumo de blocos quase iguais a partir desta similaridade (0-1; 0 = só blocos iguais)")
+    parser.add_argument("--docx-streaming", action="store_true", default=DOCX_STREAMING, help="Grava o .docx seção por seção, sem manter o documento inteiro em memória")
+    parser.add_argument("--gerar-markdown", action="store_true", default=GERAR_MARKDOWN, help="Também converte os notebooks para markdown/")
+    parser.add_argument("-y", "--yes", action="store_true", help="Não faz perguntas: cria o DIT e usa a chave OPENAI_API_KEY já configurada")
+    parser.add_argument("--json", action="store_true", help="Imprime no stdout apenas o resumo da execução em JSON (logs vão para o stderr)")
+    parser.add_argument("--progresso", action="store_true", help="Emite no stdout eventos de progresso, um JSON por linha, enquanto o DIT é gerado")
+    parser.add_argument("--import-profile", action="store_true", help="Mede o tempo de importação de main.py e das dependências pesadas e sai")
+    return parser
+
+# Função principal
+#---------------------------------------------------------------------------------------------------------------------------------
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if args.import_profile:
+        return perfil_importacao(args)
+
+    # Em modo --json/--progresso o stdout fica reservado para os eventos e o resumo da execução
+    saida_json = sys.stdout
+    destino = None
+    if args.progresso:
+        from functions.progresso import destino_jsonl
+        destino = destino_jsonl(saida_json)
+    with redirect_stdout(sys.stderr if args.json or args.progresso else sys.stdout):
+        resumo = executar(args, destino_progresso=destino)
+
+    if args.json:
+        print(json.dumps(resumo, ensure_ascii=False), file=saida_json)
+    return 0 if resumo["status"] in ("ok", "cancelado") else 1
+
+#---------------------------------------------------------------------------------------------------------------------------------
+# Módulos carregados sob demanda pelo pipeline, medidos em --import-profile junto com o próprio main
+MODULOS_PESADOS = ("docx", "langchain_openai", "tiktoken")
+
+def perfil_importacao(args):
+    from functions.perfil_importacao import medir_importacoes, relatorio_importacoes
+    script_dir = Path(__file__).resolve().parent
+    medicoes = medir_importacoes(("main",) + MODULOS_PESADOS, cwd=script_dir)
+    if args.json:
+        print(json.dumps(
+            {"importacoes": [{"modulo": nome, "acumulado_ms": round(acumulado, 1), "proprio_ms": round(proprio, 1)}
+                             for nome, acumulado, proprio in medicoes]},
+            ensure_ascii=False
+        ))
+    else:
+        print(relatorio_importacoes(medicoes))
+    return 0
+
+#---------------------------------------------------------------------------------------------------------------------------------
+def executar(args, api_key=None, destino_progresso=None):
+    # Ponto de entrada reutilizável (ex.: interface.py chama direto, sem subir outro interpretador).
+    # O estado de cada chamada fica na sua Execucao: várias execuções podem rodar ao mesmo tempo no processo
+    # api_key: chave da OpenAI desta execução (padrão: OPENAI_API_KEY)
+    # destino_progresso(evento): recebe os eventos de progresso (ver functions/progresso.py)
+    from functions.progresso import EmissorProgresso
+
+    progresso = EmissorProgresso(destino_progresso)
+    resumo = _executar(args, api_key, progresso)
+    progresso.emitir("fim", status=resumo["status"])
+    return resumo
+
+def _executar(args, api_key, progresso):
+    inicio = time.perf_counter()
+    tempos = {}
+    resumo = {"status": "ok", "modelo": args.modelo, "tempos": tempos}
+
+    script_dir = Path(__file__).resolve().parent
+    if str(script_dir / "functions") not in sys.path:
+        sys.path.insert(0, str(script_dir / "functions"))
+    base_dir = (args.base_dir or script_dir).resolve()
+
+    from functions.log import configurar_logger, fechar_logger
+    from functions.estrutura import criar_pastas as criar_pastas_dinamico
+    from functions.conversao import converter_notebooks, versao_conversor
+    from functions.manifesto import planejar_conversao, registrar_conversoes
+    from functions.upsert_key_gpt import upsert_key_gpt
+    from functions.create_key_gpt import create_key_gpt
+
+    from functions.cache_llm import CacheLLM
+
+    logger = configurar_logger(base_dir)
+    if args.sem_cache:
+        cache_llm = None
+    else:
+        cache_dir = args.cache_dir or Path(os.getenv("DIT_CACHE_DIR") or base_dir / "cache")
+        cache_llm = CacheLLM(cache_dir / "llm_cache.sqlite3", CACHE_MAX_MB * 1024 * 1024)
+
+    ex = Execucao(
+        modelo=args.modelo,
+        cache_llm=cache_llm,
+        progresso=progresso,
+        logger=logger,
+        max_concorrencia=args.concorrencia,
+        docx_streaming=args.docx_streaming,
+        sumario_llm=args.sumario_llm,
+        sumario_campo=args.sumario_campo,
+        dedup_codigo=not args.sem_dedup,
+        dedup_similaridade=args.dedup_similaridade
     )
 
+    notebooks_dir = args.entrada or base_dir / "notebooks"
+    saida = args.saida or base_dir / "doc" / "DIT.docx"
+    resumo.update({"entrada": str(notebooks_dir), "saida": str(saida)})
+
+    try:
+        # find_spec só verifica se o pacote existe, sem pagar o custo de importar o nbconvert
+        import importlib.util
+        if args.gerar_markdown and importlib.util.find_spec("nbconvert") is None:
+            print("[ERRO] nbconvert não está instalado. Instalando...")
+            try:
+                subprocess.check_call([sys.executable, "-m", "pip", "install", "nbconvert"])
+            except Exception as install_error:
+                # Exceção, e não sys.exit: executar também roda nos workers da fila de jobs da interface
+                raise RuntimeError(f"Falha ao instalar nbconvert: {install_error}") from install_error
+
+        notebooks = sorted(f for f in notebooks_dir.glob("*.ipynb") if f.is_file())
+        resumo["notebooks"] = len(notebooks)
+        if not notebooks:
+            logger.warning("Nenhum arquivo .ipynb encontrado.")
+            resumo["status"] = "sem_notebooks"
+            return resumo
+
+        if args.gerar_markdown:
+            logger.info("[OK] Iniciando conversão de notebooks para Markdown...")
+
+            with medir_etapa(tempos, "conversao"):
+                # Conversão incremental: só notebooks novos ou alterados desde a última execução
+                markdown_dir = base_dir / "markdown"
+                versao = versao_conversor()
+                pendentes, hashes, manifesto = planejar_conversao(notebooks, markdown_dir, versao, logger)
+
+                total = len(notebooks)
+                convertidos, falhas = converter_notebooks(pendentes, base_dir, logger, WORKERS_CONVERSAO)
+                registrar_conversoes(markdown_dir, manifesto, convertidos, hashes, versao)
+
+            logger.info("========== RESUMO ==========")
+            logger.info(f"Total: {total}, Sucesso: {len(convertidos)}, Falhas: {falhas}, Sem alteração: {total - len(pendentes)}")
+            logger.info("============================")
+            resumo["conversao"] = {"convertidos": len(convertidos), "falhas": falhas, "sem_alteracao": total - len(pendentes)}
+
+        if args.yes:
+            resposta = "s"
+        else:
+            print()
+            resposta = input("Deseja criar um arquivo DIT final? (S/n): ").strip().lower()
+
+        if resposta not in ["s", "sim", ""]:
+            logger.info("[=] Criação do arquivo Dit cancelada.")
+            resumo["status"] = "cancelado"
+            return resumo
+
+        if args.yes:
+            if not (api_key or os.getenv("OPENAI_API_KEY")):
+                logger.error("[✗] OPENAI_API_KEY não definida (.env ou variável de ambiente).")
+                resumo["status"] = "erro"
+                resumo["erro"] = "OPENAI_API_KEY não definida"
+                return resumo
+        else:
+            create_key_gpt(script_dir)
+            load_dotenv(script_dir / ".env", override=True)
+
+        dit_path = saida.parent / "notebooks.docx"
+        dit_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(dit_path, "w", encoding="utf-8") as dit_file:
+            for arquivo in notebooks:
+                dit_file.write(f"{arquivo.name}\n")
+        logger.info(f"[+] Arquivo Dit criado: {dit_path}")
+
+        # Agora criamos o documento final, lendo as células direto dos notebooks
+        ex.llm = obter_cliente_llm(args.modelo, api_key)
+        resumo["resumos"] = criar_doc_com_conteudo(ex, notebooks, saida, tempos)
+    except Exception as e:
+        logger.exception(f"[✗] Erro na geração do DIT: {e}")
+        resumo["status"] = "erro"
+        resumo["erro"] = str(e)
+    finally:
+        if ex.llm is not None:
+            liberar_cliente_llm(ex.llm)
+        if cache_llm is not None:
+            resumo["cache"] = {"acertos": cache_llm.acertos, "falhas": cache_llm.falhas}
+            cache_llm.fechar()
+        resumo["tokens"] = progresso.tokens
+        resumo["tempos"]["total"] = round(time.perf_counter() - inicio, 3)
+        # Fecha o arquivo de log: a pasta da execução pode ser removida em seguida (interface)
+        fechar_logger(logger)
+
+    return resumo
+
+# Execução
 if __name__ == "__main__":
-    interface.launch(server_port=7860)
\ No newline at end of file
+    sys.exit(main())
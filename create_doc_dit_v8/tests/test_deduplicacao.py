@@ -0,0 +1,75 @@
+import sys
+import unittest
+from pathlib import Path
+
+# Testes do índice de blocos repetidos (functions/deduplicacao.py)
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from functions.deduplicacao import IndiceDeduplicacao, hash_codigo, normalizar_codigo
+
+CONFIGURACAO = '''container_target = "silver"
+delta_file = f"abfss://{container_target}@datalake.dfs.core.windows.net/vendas/dim_empresa"
+reprocessar = dbutils.widgets.get("reprocessar")
+if reprocessar == "S":
+    df = spark.read.format("delta").load(delta_file)
+    df = df.filter(df.data >= "2024-01-01")
+    df.write.mode("overwrite").format("delta").save(delta_file)
+'''
+
+
+class TestNormalizacao(unittest.TestCase):
+    def test_comentarios_e_espacos_nao_contam(self):
+        a = "x = 1  # contador\n\n\ny=x+1\n"
+        b = "# início\nx=1\ny = x + 1"
+        self.assertEqual(hash_codigo(a), hash_codigo(b))
+
+    def test_indentacao_diferencia_estrutura(self):
+        a = "if x:\n    y = 1\n    z = 2"
+        b = "if x:\n    y = 1\nz = 2"
+        self.assertNotEqual(hash_codigo(a), hash_codigo(b))
+
+    def test_comando_magico_e_codigo_invalido(self):
+        self.assertEqual(normalizar_codigo("%run  ../00_config/ingestion_function"), "%run ../00_config/ingestion_function")
+        self.assertEqual(normalizar_codigo("# só comentário\ndef f(:\n   x"), "def f(:\nx")
+
+
+class TestIndiceDeduplicacao(unittest.TestCase):
+    def test_iguais_apontam_para_o_primeiro(self):
+        indice = IndiceDeduplicacao()
+        self.assertEqual(indice.adicionar((1, 1), "%run ../config"), (1, 1))
+        self.assertEqual(indice.adicionar((2, 1), "%run   ../config\n"), (1, 1))
+        self.assertEqual(indice.adicionar((2, 2), "x = 1"), (2, 2))
+        self.assertEqual(indice.copias, {(1, 1): [(2, 1)]})
+        self.assertEqual(indice.repetidos, 1)
+
+    def test_quase_iguais_so_com_similaridade(self):
+        variante = CONFIGURACAO.replace("dim_empresa", "dim_filial")
+
+        exato = IndiceDeduplicacao()
+        exato.adicionar((1, 1), CONFIGURACAO)
+        self.assertEqual(exato.adicionar((2, 1), variante), (2, 1))
+
+        aproximado = IndiceDeduplicacao(similaridade=0.8)
+        aproximado.adicionar((1, 1), CONFIGURACAO)
+        self.assertEqual(aproximado.adicionar((2, 1), variante), (1, 1))
+        self.assertEqual(aproximado.repetidos, 1)
+
+    def test_blocos_diferentes_nao_sao_agrupados(self):
+        indice = IndiceDeduplicacao(similaridade=0.8)
+        indice.adicionar((1, 1), CONFIGURACAO)
+        outro = "import pandas as pd\nvendas = pd.read_csv('vendas.csv')\ntotal = vendas.groupby('loja').valor.sum()\nprint(total.head(10))"
+        self.assertEqual(indice.adicionar((2, 1), outro), (2, 1))
+        self.assertEqual(indice.repetidos, 0)
+
+    def test_blocos_curtos_so_por_igualdade(self):
+        indice = IndiceDeduplicacao(similaridade=0.1)
+        indice.adicionar((1, 1), "x = 1")
+        self.assertEqual(indice.adicionar((1, 2), "x = 2"), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import sys
+import unittest
+from pathlib import Path
+
+# Testes da divisão de células grandes (functions/divisao_codigo.py)
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from functions.divisao_codigo import _unidades_python, _unidades_texto, dividir_codigo
+from functions.empacotamento import contar_tokens
+
+MODELO = "gpt-4o-mini"
+
+DECORADO = '''import functools
+
+x = 1
+
+# cache da consulta
+@functools.lru_cache(maxsize=None)
+@staticmethod
+def consulta(tabela):
+    return spark.table(tabela)
+
+@dataclass
+class Config:
+    caminho: str
+'''
+
+
+class TestDivisaoCodigo(unittest.TestCase):
+    def test_decoradores_ficam_com_a_funcao(self):
+        unidades = _unidades_python(DECORADO)
+        self.assertEqual(len(unidades), 4)
+        self.assertEqual(unidades[1].strip(), "x = 1")
+        self.assertTrue(unidades[2].lstrip().startswith("# cache da consulta\n@functools.lru_cache"))
+        self.assertIn("@staticmethod\ndef consulta(tabela):", unidades[2])
+        self.assertTrue(unidades[3].lstrip().startswith("@dataclass\nclass Config:"))
+        self.assertNotIn("@", unidades[1])
+
+    def test_partes_de_funcao_decorada_comecam_no_decorador(self):
+        limite = max(contar_tokens(u, MODELO) for u in _unidades_python(DECORADO))
+        partes = list(dividir_codigo(DECORADO, MODELO, limite))
+        self.assertGreater(len(partes), 1)
+        for parte in partes:
+            for linha in parte.splitlines():
+                if linha.startswith(("def ", "class ")):
+                    self.assertIn("@", parte.split(linha)[0])
+
+    def test_partes_cobrem_o_codigo_em_ordem(self):
+        codigo = "\n".join(f"df_{n} = spark.table('t_{n}')" for n in range(200))
+        partes = list(dividir_codigo(codigo, MODELO, 100))
+        self.assertGreater(len(partes), 1)
+        self.assertEqual("\n".join(partes), codigo)
+        self.assertTrue(all(contar_tokens(p, MODELO) <= 100 for p in partes))
+
+    def test_codigo_que_nao_e_python_divide_por_linhas_em_branco(self):
+        codigo = "%sql\nSELECT 1;\nSELECT 2\n\nSELECT 3"
+        self.assertIsNone(_unidades_python(codigo))
+        self.assertEqual(_unidades_texto(codigo), ["%sql\nSELECT 1;", "SELECT 2\n", "SELECT 3"])
+
+    def test_linha_maior_que_o_limite_e_cortada_por_tokens(self):
+        linha = "x = [" + ", ".join(str(n) for n in range(500)) + "]"
+        partes = list(dividir_codigo(linha, MODELO, 50))
+        self.assertGreater(len(partes), 1)
+        self.assertEqual("".join(partes), linha)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Testes da fila de jobs e da limpeza das pastas de jobs da interface (sem LLM: main.executar é substituído)
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+import interface
+from functions.fila_jobs import FilaJobs, STATUS_CONCLUIDO, STATUS_ERRO
+
+def aguardar_job(fila, job_id, timeout=10):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        job = fila.status(job_id)
+        if job["status"] in (STATUS_CONCLUIDO, STATUS_ERRO):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} não terminou em {timeout}s")
+
+
+class TestFilaJobs(unittest.TestCase):
+    def test_resultado_e_erro(self):
+        def executar_job(parametros, atualizar):
+            if parametros["falhar"]:
+                raise ValueError("falha simulada")
+            atualizar(0.5, "meio")
+            return "ok"
+
+        fila = FilaJobs(executar_job, num_workers=1)
+        certo = fila.submeter(falhar=False)
+        errado = fila.submeter(falhar=True)
+        self.assertEqual(aguardar_job(fila, certo)["resultado"], "ok")
+        job = aguardar_job(fila, errado)
+        self.assertEqual(job["status"], STATUS_ERRO)
+        self.assertEqual(job["erro"], "falha simulada")
+
+    def test_pastas_em_execucao(self):
+        liberar = threading.Event()
+
+        def executar_job(parametros, atualizar):
+            atualizar(pasta=parametros["pasta"])
+            liberar.wait(10)
+
+        fila = FilaJobs(executar_job, num_workers=1)
+        job_id = fila.submeter(pasta="/tmp/dit_job_x")
+        limite = time.monotonic() + 5
+        while not fila.pastas_em_execucao() and time.monotonic() < limite:
+            time.sleep(0.01)
+        self.assertEqual(fila.pastas_em_execucao(), {"/tmp/dit_job_x"})
+        liberar.set()
+        aguardar_job(fila, job_id)
+        self.assertEqual(fila.pastas_em_execucao(), set())
+
+
+class TestLimpezaJobsInterface(unittest.TestCase):
+    def setUp(self):
+        # Pastas de job e notebooks numa pasta temporária própria, com TTL zero: toda pasta parada é "antiga"
+        self.raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.raiz, ignore_errors=True)
+        self.notebooks = Path(self.raiz) / "entrada"
+        self.notebooks.mkdir()
+        (self.notebooks / "a.ipynb").write_text("{}", encoding="utf-8")
+
+        os.mkdir(os.path.join(self.raiz, "tmp"))
+        for patcher in (
+            mock.patch.object(tempfile, "tempdir", os.path.join(self.raiz, "tmp")),
+            mock.patch.object(interface, "JOB_TTL", 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_job_novo_nao_remove_a_pasta_de_um_job_em_execucao(self):
+        iniciou, liberar = threading.Event(), threading.Event()
+
+        def executar_falso(args, api_key=None, destino_progresso=None):
+            # O primeiro job fica "parado nas chamadas ao LLM" sem gravar nada na pasta
+            if not iniciou.is_set():
+                iniciou.set()
+                liberar.wait(10)
+            doc = Path(args.base_dir) / "doc"
+            doc.mkdir(parents=True, exist_ok=True)
+            (doc / "DIT.docx").write_bytes(b"docx")
+            return {"status": "ok"}
+
+        fila = FilaJobs(interface.executar_job, num_workers=2)
+        with mock.patch.object(interface, "FILA", fila), mock.patch.object(interface.main, "executar", executar_falso):
+            lento = fila.submeter(token="x", diretorio=str(self.notebooks))
+            self.assertTrue(iniciou.wait(10))
+            pasta_lento = Path(fila.status(lento)["pasta"])
+            antigo = time.time() - 3600
+            os.utime(pasta_lento, (antigo, antigo))
+
+            rapido = fila.submeter(token="x", diretorio=str(self.notebooks))
+            self.assertEqual(aguardar_job(fila, rapido)["status"], STATUS_CONCLUIDO)
+            self.assertTrue(pasta_lento.is_dir(), "a limpeza removeu a pasta de um job em execução")
+
+            liberar.set()
+            job = aguardar_job(fila, lento)
+            self.assertEqual(job["status"], STATUS_CONCLUIDO, job["erro"])
+            self.assertTrue(Path(job["resultado"]).exists())
+
+    def test_pasta_de_job_finalizado_e_removida(self):
+        pasta = Path(tempfile.mkdtemp(prefix=interface.PREFIXO_JOB))
+        antigo = time.time() - 3600
+        os.utime(pasta, (antigo, antigo))
+        interface.limpar_jobs_antigos()
+        self.assertFalse(pasta.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Testes do limite de taxa e do disjuntor contra o servidor LLM local (sem acesso à API real).
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from functions.limite_taxa import BaldeTokens, CircuitoAberto, ClienteLLMResiliente, Disjuntor
+from functions.servidor_llm_local import iniciar_servidor_llm_local
+
+MODELO = "gpt-4o-mini"
+
+def criar_cliente(base_url, **kwargs):
+    from langchain_openai import ChatOpenAI
+
+    def criar_llm(http_client):
+        return ChatOpenAI(
+            model_name=MODELO, openai_api_key="chave-teste", openai_api_base=base_url,
+            max_retries=0, http_client=http_client,
+        )
+
+    kwargs.setdefault("espera_base", 0.01)
+    kwargs.setdefault("espera_max", 0.05)
+    return ClienteLLMResiliente(criar_llm, MODELO, **kwargs)
+
+def invocar_em_thread(cliente, prompt, timeout=10):
+    # Roda invoke numa thread para que um travamento vire falha do teste, não um teste pendurado
+    resultado = {}
+
+    def alvo():
+        try:
+            resultado["resposta"] = cliente.invoke(prompt)
+        except Exception as erro:
+            resultado["erro"] = erro
+
+    thread = threading.Thread(target=alvo, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return thread.is_alive(), resultado
+
+
+class TestBaldeTokens(unittest.TestCase):
+    def test_sem_limite_nao_espera(self):
+        balde = BaldeTokens(None)
+        self.assertEqual(balde.reservar(1000), 0)
+
+    def test_reservas_alem_da_capacidade_esperam_a_recarga(self):
+        balde = BaldeTokens(60)  # 1 por segundo
+        self.assertEqual(balde.reservar(60), 0)
+        self.assertAlmostEqual(balde.reservar(1), 1.0, delta=0.1)
+        self.assertAlmostEqual(balde.reservar(1), 2.0, delta=0.1)  # reservas na fila se somam
+
+    def test_ajustar_devolve_a_reserva(self):
+        balde = BaldeTokens(60)
+        balde.reservar(60)
+        balde.ajustar(60)
+        self.assertEqual(balde.reservar(30), 0)
+
+
+class TestClienteLLMResiliente(unittest.TestCase):
+    def setUp(self):
+        self.servidores = []
+
+    def tearDown(self):
+        for servidor in self.servidores:
+            servidor.shutdown()
+            servidor.server_close()
+
+    def iniciar_servidor(self, **kwargs):
+        servidor, base_url = iniciar_servidor_llm_local(**kwargs)
+        self.servidores.append(servidor)
+        return servidor, base_url
+
+    def test_capacidade_aprendida_dos_cabecalhos(self):
+        _, base_url = self.iniciar_servidor(limite_rpm=1000)
+        cliente = criar_cliente(base_url)
+        cliente.invoke("olá")
+        self.assertAlmostEqual(cliente.requisicoes.capacidade, 900)
+
+    def test_limite_configurado_menor_que_o_da_conta_prevalece(self):
+        _, base_url = self.iniciar_servidor(limite_rpm=1000)
+        cliente = criar_cliente(base_url, rpm=100)
+        cliente.invoke("olá")
+        self.assertAlmostEqual(cliente.requisicoes.capacidade, 90)
+
+    def test_retenta_429_e_5xx(self):
+        servidor, base_url = self.iniciar_servidor(respostas_erro=[429, 503])
+        cliente = criar_cliente(base_url)
+        resposta = cliente.invoke("olá")
+        self.assertIn("Resumo simulado", resposta.content)
+        self.assertEqual(servidor.requisicoes, 3)
+        self.assertEqual(cliente.retentativas, 2)
+
+    def test_erro_da_requisicao_nao_e_retentado_nem_abre_o_circuito(self):
+        import openai
+        servidor, base_url = self.iniciar_servidor(respostas_erro=[400])
+        cliente = criar_cliente(base_url, disjuntor=Disjuntor(falhas_para_abrir=1, pausa=0.05))
+        with self.assertRaises(openai.BadRequestError):
+            cliente.invoke("olá")
+        self.assertEqual(servidor.requisicoes, 1)
+        self.assertEqual(cliente.disjuntor.estado, "fechado")
+
+    def test_429_na_chamada_de_teste_fecha_o_circuito(self):
+        # Duas falhas abrem o circuito; a chamada de teste recebe 429, que precisa encerrar o meio-aberto
+        servidor, base_url = self.iniciar_servidor(respostas_erro=[503, 503, 429])
+        disjuntor = Disjuntor(falhas_para_abrir=2, pausa=0.05)
+        cliente = criar_cliente(base_url, disjuntor=disjuntor)
+
+        travado, resultado = invocar_em_thread(cliente, "olá")
+        self.assertFalse(travado, "invoke travou com o circuito meio-aberto")
+        self.assertIn("resposta", resultado)
+        self.assertEqual(disjuntor.estado, "fechado")
+        self.assertEqual(servidor.requisicoes, 4)
+
+        # Com o circuito fechado, outras threads voltam a chamar normalmente
+        travado, resultado = invocar_em_thread(cliente, "de novo")
+        self.assertFalse(travado)
+        self.assertIn("resposta", resultado)
+
+    def test_circuito_aberto_expira_depois_da_pausa_longa(self):
+        servidor, base_url = self.iniciar_servidor(respostas_erro=[503, 503])
+        disjuntor = Disjuntor(falhas_para_abrir=1, pausa=0.01, pausa_max=0.3, max_aberturas=1)
+        cliente = criar_cliente(base_url, disjuntor=disjuntor, max_tentativas=3, espera_max=0.02)
+
+        # 1ª falha abre; o teste falha e reabre além de max_aberturas; a 3ª tentativa recebe CircuitoAberto
+        with self.assertRaises(CircuitoAberto):
+            cliente.invoke("olá")
+        with self.assertRaises(CircuitoAberto):
+            cliente.invoke("olá")  # ainda dentro da pausa longa: falha na hora, sem chamar a API
+        self.assertEqual(servidor.requisicoes, 2)
+
+        time.sleep(0.35)
+        travado, resultado = invocar_em_thread(cliente, "olá")
+        self.assertFalse(travado)
+        self.assertIn("resposta", resultado, resultado.get("erro"))
+        self.assertEqual(disjuntor.estado, "fechado")
+
+    def test_chamada_de_teste_interrompida_libera_outra_thread(self):
+        disjuntor = Disjuntor(falhas_para_abrir=1, pausa=0.01)
+        disjuntor.falha()
+        time.sleep(0.02)
+        self.assertTrue(disjuntor.entrar())
+        disjuntor.liberar()
+        self.assertTrue(disjuntor.entrar())  # a próxima chamada vira o novo teste, sem travar
+        disjuntor.sucesso()
+        self.assertFalse(disjuntor.entrar())
+
+
+if __name__ == "__main__":
+    unittest.main()
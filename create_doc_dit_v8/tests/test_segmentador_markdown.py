@@ -0,0 +1,65 @@
+import sys
+import unittest
+from pathlib import Path
+
+# Testes do segmentador de markdown (functions/segmentador_markdown.py), com foco nas cercas de código
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from functions.segmentador_markdown import extrair_conteudo_markdown, segmentar_markdown
+
+def tipos(texto):
+    return [(s.tipo, s.texto) for s in segmentar_markdown(texto)]
+
+
+class TestCercas(unittest.TestCase):
+    def test_bloco_python_com_linhas(self):
+        texto = "# Título\nIntrodução\n```python\nx = 1\n```\nFim"
+        segmentos = list(segmentar_markdown(texto))
+        self.assertEqual([s.tipo for s in segmentos], ["titulo", "prosa", "codigo", "prosa"])
+        codigo = segmentos[2]
+        self.assertEqual((codigo.texto, codigo.linha_inicio, codigo.linha_fim, codigo.linguagem), ("x = 1", 3, 5, "python"))
+
+    def test_cerca_de_til_nao_fecha_com_crases(self):
+        texto = "~~~python\nprint('```')\n```\n~~~\n"
+        self.assertEqual(tipos(texto), [("codigo", "print('```')\n```")])
+
+    def test_fechamento_precisa_do_mesmo_comprimento(self):
+        texto = "````python\na = 1\n```\nb = 2\n`````\ndepois"
+        self.assertEqual(tipos(texto), [("codigo", "a = 1\n```\nb = 2"), ("prosa", "depois")])
+
+    def test_cerca_com_texto_depois_nao_fecha(self):
+        texto = "```python\na = 1\n``` fim\n```"
+        self.assertEqual(tipos(texto), [("codigo", "a = 1\n``` fim")])
+
+    def test_cerca_aberta_vai_ate_o_fim(self):
+        segmentos = list(segmentar_markdown("texto\n```python\na = 1\nb = 2"))
+        self.assertEqual(segmentos[-1].tipo, "codigo")
+        self.assertEqual(segmentos[-1].texto, "a = 1\nb = 2")
+        self.assertEqual(segmentos[-1].linha_fim, 4)
+
+    def test_quatro_espacos_nao_abrem_cerca(self):
+        self.assertEqual(tipos("   ```py\nx\n```"), [("codigo", "x")])
+        self.assertEqual([t for t, _ in tipos("    ```py\nx\n    ```")], ["prosa"])
+
+    def test_titulo_dentro_da_cerca_e_codigo(self):
+        self.assertEqual(tipos("```python\n# comentário\n| a |\n```"), [("codigo", "# comentário\n| a |")])
+
+    def test_cerca_vazia_e_crlf(self):
+        self.assertEqual(tipos("```python\r\n```\r\nfim\r\n"), [("codigo", ""), ("prosa", "fim")])
+
+    def test_extrair_filtra_linguagem_titulos_e_tabelas(self):
+        texto = (
+            "# Notebook\nTexto\n| a | b |\n|---|---|\n"
+            "```PYTHON\nx = 1\n```\n~~~sql\nselect 1\n~~~\n```\nsem linguagem\n```\nMais texto"
+        )
+        prosa, codigos = extrair_conteudo_markdown(texto)
+        self.assertEqual(prosa, "Texto\nMais texto")
+        self.assertEqual(codigos, ["x = 1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
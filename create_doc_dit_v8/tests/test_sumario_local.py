@@ -0,0 +1,52 @@
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Testes da normalização de títulos do sumário local (functions/sumario_local.py)
+# Uso: python -m unittest discover -s tests   (ou python -m pytest tests)
+
+base_dir = Path(__file__).resolve().parent.parent
+if str(base_dir) not in sys.path:
+    sys.path.insert(0, str(base_dir))
+
+from functions.sumario_local import DICIONARIO_PADRAO, carregar_dicionario, gerar_sumario_local, normalizar_titulo
+
+
+class TestNormalizarTitulo(unittest.TestCase):
+    def test_prefixo_numerico_separadores_e_siglas(self):
+        self.assertEqual(normalizar_titulo("01_dim_empresa_farol.ipynb"), "DIM Empresa Farol")
+        self.assertEqual(normalizar_titulo("02 - carga-api_sql.md"), "Carga API SQL")
+        self.assertEqual(normalizar_titulo("fato__VENDAS  diarias"), "Fato Vendas Diarias")
+
+    def test_preposicoes_minusculas_exceto_no_inicio(self):
+        self.assertEqual(normalizar_titulo("03_carga_de_dados_do_sap.ipynb"), "Carga de Dados do Sap")
+        self.assertEqual(normalizar_titulo("a_carga_dos_dados"), "A Carga dos Dados")
+
+    def test_nome_so_com_numeros_fica_como_esta(self):
+        self.assertEqual(normalizar_titulo("2024.ipynb"), "2024")
+
+    def test_dicionario_informado(self):
+        dicionario = dict(DICIONARIO_PADRAO, sap="SAP", diarias="Diárias")
+        self.assertEqual(normalizar_titulo("fato_vendas_diarias_sap", dicionario), "Fato Vendas Diárias SAP")
+
+    def test_dicionario_de_arquivo_json(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        caminho = Path(pasta) / "titulos.json"
+        caminho.write_text(json.dumps({"SAP": "SAP"}), encoding="utf-8")
+        dicionario = carregar_dicionario(str(caminho))
+        self.assertEqual(dicionario["sap"], "SAP")
+        self.assertEqual(dicionario["dim"], "DIM")
+
+    def test_sumario_numerado(self):
+        self.assertEqual(
+            gerar_sumario_local(["01_dim_empresa.ipynb", "02_fato_vendas.ipynb"], DICIONARIO_PADRAO),
+            "1. DIM Empresa\n2. Fato Vendas",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,8 +6,8 @@ import logging
 from pathlib import Path
 from datetime import datetime
 import platform
-import psutil  # pip install psutil (para infos de hardware)
 import shutil
+from contextlib import contextmanager
 
 # Configuração do logger
 # O logger é configurado para registrar mensagens de log no console e em um arquivo de log  
@@ -60,6 +60,16 @@ def criar_arquivo_instalacao(caminho_arquivo: Path):
     """
 
     if not caminho_arquivo.exists():
+        # psutil é importado aqui: no .venv recém-criado (instalar-offline) ele ainda não foi instalado,
+        # e o arquivo de instalação não pode impedir a instalação dos pacotes
+        try:
+            import psutil  # pip install psutil (para infos de hardware)
+            num_cpus = psutil.cpu_count(logical=True)
+            memoria = f"{round(psutil.virtual_memory().total / (1024 ** 3), 2)} GB"
+        except ImportError:
+            num_cpus = os.cpu_count() or "N/A"
+            memoria = "N/A"
+
         info = f"""\
 ===========================================
           SISTEMA: Create Doc DIT System
@@ -96,8 +106,8 @@ Informações do Ambiente:
 - Nome do Host: {platform.node()}
 - Arquitetura: {platform.machine()}
 - Processador: {platform.processor() or "N/A"}
-- Número de CPUs: {psutil.cpu_count(logical=True)}
-- Memória RAM Total: {round(psutil.virtual_memory().total / (1024 ** 3), 2)} GB
+- Número de CPUs: {num_cpus}
+- Memória RAM Total: {memoria}
 - Espaço Disco Disponível (na pasta atual): {round(shutil.disk_usage(caminho_arquivo.parent).free / (1024 ** 3), 2)} GB
 - Python Version: {platform.python_version()}
 - Python Implementação: {platform.python_implementation()}
@@ -179,40 +189,207 @@ def atualizar_pip():
         sys.exit(1)
 
 
-# Função para instalar pacotes necessários
-# Ela define uma lista de pacotes e suas versões, verifica se cada pacote já está instalado 
-def installer_packages():
+# Lista de pacotes necessários, com as versões fixadas quando importa
+PACOTES = [
+    'ipykernel',
+    'langchain==0.1.16',
+    'langchain-community==0.0.33',
+    'langchain-openai==0.1.3',
+    'openai==1.55.3',
+    'huggingface_hub==0.22.2',
+    'transformers==4.39.3',
+    'jinja2==3.1.3',
+    'tiktoken==0.6.0',
+    'pypdf==4.2.0',
+    'yt_dlp==2024.4.9',
+    'pydub==0.25.1',
+    'beautifulsoup4==4.12.3',
+    'python-dotenv',
+    'sentence-transformers==2.7.0',
+    'langchain-chroma',
+    'faiss-cpu',
+    'lark',
+    'python-docx',
+    'gradio==5.39.0',
+    'psutil',
+    "nbconvert"
+]
+
+
+# Função para medir o tempo de uma etapa da instalação
+# Registra no log a duração de cada etapa, para acompanhar o tempo total de instalação
+@contextmanager
+def medir_etapa(nome: str):
+    import time
+    logger = logging.getLogger("installer_logger")
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        logger.info(f"[⏱] {nome}: {time.perf_counter() - inicio:.2f}s")
+
+
+# Função para verificar quais pacotes ainda precisam ser instalados
+# Consulta as versões instaladas no próprio processo (importlib.metadata), sem chamar pip show por pacote.
+# Um pacote entra na lista se não estiver instalado ou se a versão instalada for diferente da fixada.
+def pacotes_faltantes(pacotes):
+    """
+    Retorna a lista de especificações (ex.: 'gradio==5.39.0') que ainda não estão satisfeitas no ambiente.
+    """
+    from importlib import metadata
+
+    faltantes = []
+    for lib in pacotes:
+        lib = lib.strip()
+        if not lib or lib.startswith("#"):
+            continue
+        nome, _, versao = lib.partition("==")
+        try:
+            instalada = metadata.version(nome.strip())
+        except metadata.PackageNotFoundError:
+            faltantes.append(lib)
+            continue
+        if versao and instalada != versao.strip():
+            faltantes.append(lib)
+    return faltantes
+
+
+# Wheelhouse: pasta com os wheels de todos os pacotes (e dependências) para instalar sem internet.
+# O arquivo de requisitos gerado fixa a versão e o hash sha256 de cada wheel.
+ARQUIVO_REQUISITOS_WHEELHOUSE = "requirements-wheelhouse.txt"
+
+
+# Função para calcular o hash sha256 de um arquivo, lendo em blocos
+def hash_arquivo(caminho: Path) -> str:
+    import hashlib
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+# Função para construir o wheelhouse a partir da lista de pacotes (máquina com internet)
+# Usa "pip wheel" para baixar (ou compilar, no caso de sdists) os wheels de todos os pacotes e dependências
+# e grava o arquivo de requisitos com nome==versão e --hash de cada wheel.
+def construir_wheelhouse(destino: Path):
+    """
+    Gera em 'destino' os wheels de PACOTES e o arquivo requirements-wheelhouse.txt com os hashes.
+    O wheelhouse deve ser construído na mesma plataforma e versão do Python das máquinas de destino.
+    """
     import subprocess
     import sys
-    
-    atualizar_pip()
-
-    pacotes = [
-        'ipykernel',
-        'langchain==0.1.16',
-        'langchain-community==0.0.33',
-        'langchain-openai==0.1.3',
-        'openai==1.55.3',
-        'huggingface_hub==0.22.2',
-        'transformers==4.39.3',
-        'jinja2==3.1.3',
-        'tiktoken==0.6.0',
-        'pypdf==4.2.0',
-        'yt_dlp==2024.4.9',
-        'pydub==0.25.1',
-        'beautifulsoup4==4.12.3',
-        'python-dotenv',
-        'sentence-transformers==2.7.0',
-        'langchain-chroma',
-        'faiss-cpu',
-        'lark',
-        'python-docx',
-        'gradio==5.39.0',
-        'psutil',
-        "nbconvert"
+
+    logger = logging.getLogger("installer_logger")
+    destino.mkdir(parents=True, exist_ok=True)
+
+    # Wheels de um build anterior dariam uma segunda linha nome==versão --hash para o mesmo pacote, e o
+    # "pip install --require-hashes" recusa requisitos duplicados: o wheelhouse é sempre refeito do zero
+    antigos = list(destino.glob("*.whl"))
+    for wheel in antigos:
+        wheel.unlink()
+    if antigos:
+        logger.info(f"[-] {len(antigos)} wheel(s) de um build anterior removido(s) de {destino}.")
+
+    with medir_etapa("Download dos wheels"):
+        subprocess.run([sys.executable, "-m", "pip", "wheel", "--wheel-dir", str(destino), *PACOTES], check=True)
+
+    # Nome do wheel: {distribuição}-{versão}(-{build})?-{python}-{abi}-{plataforma}.whl
+    requisitos = {}
+    with medir_etapa("Cálculo dos hashes"):
+        for wheel in sorted(destino.glob("*.whl")):
+            nome, versao = wheel.name.split("-")[:2]
+            requisitos.setdefault(f"{nome}=={versao}", []).append(hash_arquivo(wheel))
+
+    linhas = [
+        f"{requisito} " + " ".join(f"--hash=sha256:{h}" for h in hashes)
+        for requisito, hashes in sorted(requisitos.items(), key=lambda item: item[0].lower())
     ]
-        
-        
+    (destino / ARQUIVO_REQUISITOS_WHEELHOUSE).write_text("\n".join(linhas) + "\n", encoding="utf-8")
+    logger.info(f"[✓] Wheelhouse criado em {destino}: {len(linhas)} pacote(s).")
+
+
+# Função para instalar a partir do wheelhouse (máquina sem internet)
+# O pip não consulta o PyPI (--no-index) e recusa qualquer wheel cujo hash não confira com o arquivo de requisitos.
+def instalar_do_wheelhouse(wheelhouse: Path):
+    import subprocess
+    import sys
+
+    logger = logging.getLogger("installer_logger")
+    requisitos = wheelhouse / ARQUIVO_REQUISITOS_WHEELHOUSE
+    if not requisitos.exists():
+        logger.error(f"[✗] {requisitos} não encontrado. Gere o wheelhouse com: python install_docdit_app.py wheelhouse")
+        sys.exit(1)
+
+    try:
+        with medir_etapa("Instalação a partir do wheelhouse"):
+            subprocess.run(
+                [
+                    sys.executable, "-m", "pip", "install",
+                    "--no-index", "--find-links", str(wheelhouse),
+                    "--require-hashes", "-r", str(requisitos)
+                ],
+                check=True
+            )
+    except subprocess.CalledProcessError as e:
+        logger.error(f"[✗] Erro ao instalar a partir do wheelhouse: {e}")
+        sys.exit(1)
+    logger.info("[✓] Instalação a partir do wheelhouse concluída.")
+
+
+# Impressão digital do ambiente: gravada após uma instalação bem-sucedida, dentro do próprio venv.
+# Se na próxima execução ela for igual, nada mudou desde a última instalação e a etapa inteira é pulada.
+ARQUIVO_IMPRESSAO = ".docdit_instalacao.json"
+
+
+# Função para calcular a impressão digital do ambiente
+# Combina versão do Python, plataforma, lista de pacotes fixados e caminho do venv em um hash sha256.
+def impressao_ambiente() -> dict:
+    import hashlib
+    import json
+
+    dados = {
+        "python": sys.version,
+        "plataforma": platform.platform(),
+        "pacotes": PACOTES,
+        "venv": sys.prefix,
+    }
+    dados["hash"] = hashlib.sha256(json.dumps(dados, sort_keys=True).encode("utf-8")).hexdigest()
+    return dados
+
+
+# Função para verificar se o ambiente já foi instalado com a mesma impressão digital
+def ambiente_inalterado(impressao: dict) -> bool:
+    import json
+
+    caminho = Path(sys.prefix) / ARQUIVO_IMPRESSAO
+    try:
+        salva = json.loads(caminho.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return salva.get("hash") == impressao["hash"]
+
+
+# Função para gravar a impressão digital após uma instalação bem-sucedida (gravação atômica)
+def registrar_impressao(impressao: dict):
+    import json
+
+    caminho = Path(sys.prefix) / ARQUIVO_IMPRESSAO
+    temporario = caminho.with_suffix(".tmp")
+    temporario.write_text(json.dumps(impressao, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporario, caminho)
+
+
+# Função para instalar pacotes necessários
+# Calcula os pacotes que faltam e instala todos em uma única chamada ao pip (uma só resolução de
+# dependências), com o cache do pip habilitado para reaproveitar os wheels já baixados.
+# Com wheelhouse, instala só a partir da pasta local, sem acesso à internet.
+def installer_packages(wheelhouse: Path = None):
+    import subprocess
+    import sys
+
+    logger = logging.getLogger("installer_logger")
+
     # Verifica se está em venv
     if not esta_em_venv():
         print("[⚠️ ] O script não está rodando dentro de um ambiente virtual. Criando um...")
@@ -223,36 +400,39 @@ def installer_packages():
     else:
         print("[✓] Ambiente virtual já está ativo.")
 
-    print("[⚙️] Instalando pacotes necessários...")
-    for lib in pacotes:
-        if lib.strip() and not lib.strip().startswith("#"):
-            lib_name = lib.split("==")[0].strip()
-            try:
-                # Verifica se pacote já instalado
-                pip_show = subprocess.run(
-                    [sys.executable, "-m", "pip", "show", lib_name],
-                    check=True, capture_output=True, text=True
-                )
-                if lib_name.lower() in pip_show.stdout.lower():
-                    print(f"[✓] Já instalado: {lib}")
-                    continue
-            except subprocess.CalledProcessError:
-                # Não encontrado, vai instalar
-                pass
-
-            # Tenta instalar o pacote com flag --no-cache-dir para evitar problemas com arquivos temporários
-            print(f"[⚙️] Instalando: {lib}")
-            try:
-                subprocess.run(
-                    [sys.executable, "-m", "pip", "install", lib, "--no-cache-dir"],
-                    check=True
-                )
-                print(f"[✓] Pacote instalado com sucesso: {lib}")
-            except subprocess.CalledProcessError as e:
-                print(f"[✗] Erro ao instalar {lib}: {e}. Continuando com próximo pacote...")
-        else:
-            print(f"[→] Pulando: {lib}")
-    print("[✓] Instalação de pacotes concluída.")
+    impressao = impressao_ambiente()
+    if ambiente_inalterado(impressao):
+        logger.info("[=] Ambiente sem alterações desde a última instalação; etapa de pacotes ignorada.")
+        return
+
+    # Sem internet não há como atualizar o pip; o wheelhouse já foi montado com um pip atual
+    if wheelhouse is None:
+        with medir_etapa("Atualização do pip"):
+            atualizar_pip()
+
+    with medir_etapa("Verificação dos pacotes instalados"):
+        faltantes = pacotes_faltantes(PACOTES)
+
+    if not faltantes:
+        logger.info(f"[✓] Todos os {len(PACOTES)} pacotes já estão instalados.")
+        registrar_impressao(impressao)
+        return
+
+    if wheelhouse is not None:
+        logger.info(f"[⚙️] {len(faltantes)} pacote(s) faltando; instalando a partir de {wheelhouse}")
+        instalar_do_wheelhouse(wheelhouse)
+        registrar_impressao(impressao)
+        return
+
+    logger.info(f"[⚙️] Instalando {len(faltantes)} pacote(s): {', '.join(faltantes)}")
+    try:
+        with medir_etapa(f"Instalação de {len(faltantes)} pacote(s)"):
+            subprocess.run([sys.executable, "-m", "pip", "install", *faltantes], check=True)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"[✗] Erro ao instalar os pacotes: {e}")
+        sys.exit(1)
+    registrar_impressao(impressao)
+    logger.info("[✓] Instalação de pacotes concluída.")
 
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -472,7 +652,7 @@ def garantir_venv():
 # Função principal que executa as etapas de configuração do ambiente
 # Ela garante que o ambiente virtual está ativo, instala os pacotes necessários, cria o arquivo de ambiente (.env) e cria as pastas padrão.
 # Ao final, imprime uma mensagem de sucesso e orienta o usuário a executar o script principal   
-def main():
+def main(wheelhouse: Path = None):
     # Define o diretório base do script
     base_dir = Path(__file__).resolve().parent
     
@@ -484,7 +664,7 @@ def main():
 
     # Executa as etapas de configuração
     garantir_venv()
-    installer_packages()
+    installer_packages(wheelhouse)
     cria_env(base_dir)
     criar_pastas(base_dir)
 
@@ -495,18 +675,38 @@ def main():
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Verifica se o script está sendo executado diretamente 
+# Subcomandos para máquinas sem internet:
+#   python install_docdit_app.py wheelhouse [--destino pasta]          (máquina com internet, uma vez)
+#   python install_docdit_app.py instalar-offline [--wheelhouse pasta]  (máquinas de destino)
 if __name__ == "__main__":
+    import argparse
+
     base_dir = Path(__file__).resolve().parent
     caminho_arquivo = base_dir / "informacoes_instalacao.txt"
 
-    if not caminho_arquivo.exists():
-        print("Arquivo não existe. Criando arquivo de instalação...")
-        criar_arquivo_instalacao(caminho_arquivo)
-        print("Arquivo criado. Agora executando main()...")
+    parser = argparse.ArgumentParser(description="Instalador do Create Doc DIT System.")
+    subcomandos = parser.add_subparsers(dest="comando")
+    parser_wheelhouse = subcomandos.add_parser("wheelhouse", help="Baixa os wheels de todos os pacotes para instalação offline")
+    parser_wheelhouse.add_argument("--destino", type=Path, default=base_dir / "wheelhouse")
+    parser_offline = subcomandos.add_parser("instalar-offline", help="Instala somente a partir do wheelhouse, verificando os hashes")
+    parser_offline.add_argument("--wheelhouse", type=Path, default=base_dir / "wheelhouse")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("installer_logger")
+    if args.comando == "wheelhouse":
+        configurar_logger(base_dir)
+        construir_wheelhouse(args.destino.resolve())
+    elif args.comando == "instalar-offline":
+        if not caminho_arquivo.exists():
+            criar_arquivo_instalacao(caminho_arquivo)
+        main(args.wheelhouse.resolve())
+    else:
+        # main() roda sempre: quem decide se a instalação pode ser pulada é a impressão do ambiente
+        # (ambiente_inalterado), e não a existência do arquivo de informações
+        if not caminho_arquivo.exists():
+            print("Arquivo não existe. Criando arquivo de instalação...")
+            criar_arquivo_instalacao(caminho_arquivo)
         main()
-        logger.info("[*] Arquivo Dit não criado.")  # Talvez ajustar essa mensagem?
         logger.info("[*] Finalizando o script.")
-    else:
-        print("Arquivo existe.")
 
 